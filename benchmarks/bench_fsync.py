@@ -0,0 +1,66 @@
+"""
+Per-mutation cost of each fsync policy, for full month rewrites and the journal.
+
+Run with ``python benchmarks/bench_fsync.py [mutations] [entries-in-month]``.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from do_nothing_time_tracker.models import Entry  # noqa: E402
+from do_nothing_time_tracker.models import FsyncPolicy  # noqa: E402
+from do_nothing_time_tracker.state import TrackerState  # noqa: E402
+from do_nothing_time_tracker.storage import EntryStorage  # noqa: E402
+
+
+def seed_month(base_dir: Path, count: int) -> None:
+    start = datetime(2024, 3, 1, 8, 0)
+    step = timedelta(days=28) / max(count, 1)
+    entries = [
+        Entry.new(start=start + step * idx).with_updates(end=start + step * idx + step / 2)
+        for idx in range(count)
+    ]
+    EntryStorage(base_dir=base_dir).save_month("2024-03", entries)
+
+
+def run(policy: FsyncPolicy, *, journal: bool, mutations: int, month_size: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        seed_month(base_dir, month_size)
+        storage = EntryStorage(base_dir=base_dir, journal=journal, fsync_policy=policy, fsync_interval=0.5)
+        state = TrackerState(storage)
+        timestamp = datetime(2024, 3, 29, 8, 0)
+        begin = time.perf_counter()
+        for _ in range(mutations // 2):
+            state.save_entry(Entry.new(start=timestamp))
+            open_entry = state.open_entry()
+            state.save_entry(open_entry.with_updates(end=timestamp + timedelta(minutes=1)))
+            timestamp += timedelta(minutes=2)
+        elapsed = time.perf_counter() - begin
+        state.close()
+    return elapsed / mutations * 1000
+
+
+def main() -> None:
+    mutations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    month_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    print(f"{mutations} mutations on a month with {month_size} entries (ms per mutation)")
+    print(f"{'policy':<10}{'rewrite':>10}{'journal':>10}")
+    for policy in FsyncPolicy:
+        rewrite_ms = run(policy, journal=False, mutations=mutations, month_size=month_size)
+        journal_ms = run(policy, journal=True, mutations=mutations, month_size=month_size)
+        print(f"{policy.value:<10}{rewrite_ms:>10.3f}{journal_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
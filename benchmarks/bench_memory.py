@@ -0,0 +1,93 @@
+"""
+Memory held by a history of entries: the previous dataclass ``Entry`` with
+two datetimes against the slotted epoch-minute one, plus the cost of an
+edit (``with_updates``).
+
+Run with ``python benchmarks/bench_memory.py [entries]``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable
+from typing import List
+from typing import Optional
+
+import gc
+import sys
+import timeit
+import tracemalloc
+import uuid
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from do_nothing_time_tracker.models import Entry  # noqa: E402
+
+REPEAT = 5
+
+
+@dataclass
+class DataclassEntry:
+    """The ``Entry`` layout before it was slotted."""
+
+    id: str
+    start: datetime
+    end: Optional[datetime] = None
+
+    def with_updates(
+        self,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> DataclassEntry:
+        return DataclassEntry(id=self.id, start=start or self.start, end=end if end is not None else self.end)
+
+
+def measure(build: Callable[[], List[object]]) -> tuple[List[object], int]:
+    gc.collect()
+    tracemalloc.start()
+    items = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, size
+
+
+def payloads(count: int) -> List[dict]:
+    start = datetime(2020, 1, 1, 8, 0)
+    step = timedelta(days=365 * 5) / count
+    return [
+        Entry(id=str(uuid.uuid4()), start=start + step * idx, end=start + step * idx + step / 2).to_dict()
+        for idx in range(count)
+    ]
+
+
+def load_dataclass(payload: dict) -> DataclassEntry:
+    return DataclassEntry(
+        id=payload["id"],
+        start=datetime.fromisoformat(payload["start"]),
+        end=datetime.fromisoformat(payload["end"]),
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    data = payloads(count)
+    print(f"{count} entries, built from month-file payloads (ids are shared and not counted)")
+    print(f"{'variant':<16}{'total KiB':>12}{'bytes/entry':>14}{'edit us':>10}")
+    for label, load in (("dataclass", load_dataclass), ("slotted", Entry.from_dict)):
+        entries, size = measure(lambda load=load: [load(payload) for payload in data])
+        first = entries[0]
+        edit_end = first.end + timedelta(minutes=5)
+        edit_us = min(
+            timeit.repeat(lambda first=first: first.with_updates(end=edit_end), number=10_000, repeat=REPEAT)
+        ) / 10_000 * 1e6
+        print(f"{label:<16}{size / 1024:>12.0f}{size / count:>14.1f}{edit_us:>10.2f}")
+        del entries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Month file load/save timings for the available JSON codecs and the
+columnar format, plus a raw column scan that builds no entries.
+
+Run with ``python benchmarks/bench_storage.py [entries-per-month]``.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable
+from typing import List
+
+import sys
+import tempfile
+import timeit
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from do_nothing_time_tracker.models import Entry  # noqa: E402
+from do_nothing_time_tracker.storage import EntryStorage  # noqa: E402
+from do_nothing_time_tracker.storage import get_codec  # noqa: E402
+from do_nothing_time_tracker.storage import JsonCodec  # noqa: E402
+
+import json  # noqa: E402
+
+REPEAT = 5
+
+
+def build_month(count: int) -> List[Entry]:
+    start = datetime(2025, 1, 1, 8, 0)
+    step = timedelta(days=31) / count
+    return [
+        Entry.new(start=start + step * idx).with_updates(end=start + step * idx + step / 2)
+        for idx in range(count)
+    ]
+
+
+def best_of(func: Callable[[], object]) -> float:
+    return min(timeit.repeat(func, number=1, repeat=REPEAT)) * 1000
+
+
+def legacy_save(path: Path, entries: List[Entry]) -> None:
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump([entry.to_dict() for entry in entries], handle, indent=2)
+
+
+def legacy_load(path: Path) -> List[Entry]:
+    with path.open("r", encoding="utf-8") as handle:
+        return [Entry.from_dict(item) for item in json.load(handle)]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    entries = build_month(count)
+    codecs = {codec.name: codec for codec in (JsonCodec(), get_codec("auto"))}
+    print(f"{count} entries per month, best of {REPEAT} (ms)")
+    print(f"{'variant':<28}{'save':>10}{'load':>10}{'size KiB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "legacy.json"
+        save_ms = best_of(lambda: legacy_save(path, entries))
+        load_ms = best_of(lambda: legacy_load(path))
+        size = path.stat().st_size / 1024
+        print(f"{'legacy json.dump indent=2':<28}{save_ms:>10.1f}{load_ms:>10.1f}{size:>12.0f}")
+        for label, codec in codecs.items():
+            for indent in (True, False):
+                storage = EntryStorage(base_dir=Path(tmp) / f"{label}-{indent}", codec=codec, indent=indent)
+                save_ms = best_of(lambda storage=storage: storage.save_month("2025-01", entries))
+                load_ms = best_of(lambda storage=storage: storage.load_month("2025-01"))
+                size = storage._path_for_key("2025-01").stat().st_size / 1024
+                variant = f"{codec.name} {'indent' if indent else 'compact'}"
+                print(f"{variant:<28}{save_ms:>10.1f}{load_ms:>10.1f}{size:>12.0f}")
+        storage = EntryStorage(base_dir=Path(tmp) / "columnar", month_format="columnar")
+        save_ms = best_of(lambda: storage.save_month("2025-01", entries))
+        load_ms = best_of(lambda: storage.load_month("2025-01"))
+        size = storage._columns_path_for_key("2025-01").stat().st_size / 1024
+        print(f"{'columnar':<28}{save_ms:>10.1f}{load_ms:>10.1f}{size:>12.0f}")
+        scan_ms = best_of(lambda: scan_minutes(storage))
+        print(f"{'columnar scan (no entries)':<28}{'':>10}{scan_ms:>10.1f}")
+
+
+def scan_minutes(storage: EntryStorage) -> int:
+    with storage.month_columns("2025-01") as columns:
+        return sum(end - start for start, end in zip(columns.starts, columns.ends))
+
+
+if __name__ == "__main__":
+    main()
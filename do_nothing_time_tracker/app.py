@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 from .config import ConfigService
+from .events import AbsencesChanged
+from .events import ChangeEvent
+from .history import Edit
 from .models import Config
 from .models import Entry
 from .models import SummaryExpectedMode
+from .registry import registry
+from .registry import SharedSession
 from .state import TrackerState
-from .storage import AbsenceStorage
-from .storage import EntryStorage
-from .summaries import ConfigAbsenceRetriever
-from .summaries import get_month_summary
-from .summaries import get_week_summary
-from .summaries import get_year_summary
+from .summaries import AbsenceIndex
+from .summaries import DailyLedger
+from .summaries import DayDetailsCache
 from .summaries import RangeSummary
 from .ui.components import format_duration
 from .ui.components import sentence_card
@@ -27,6 +29,7 @@ from calendar import monthrange
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
+from functools import partial
 from pathlib import Path
 from typing import Callable
 from typing import Optional
@@ -41,6 +44,11 @@ class TrackerApp:
         self.config_service = ConfigService()
         self.config: Config = self.config_service.load()
         self.data_dir: Path = self.config_service.resolve_data_dir(self.config)
+        # State, storages and change events are shared with every other
+        # session (browser tab) attached to the same data directory.
+        self._session: SharedSession | None = None
+        self._unsubscribe: Callable[[], None] | None = None
+        self._seen_revision = 0
         self._setup_storage()
         self.selected_date = date.today()
 
@@ -96,6 +104,9 @@ class TrackerApp:
             "year": None,
         }
         self._ticker_task: asyncio.Task | None = None
+        self._ticker_day = date.today()
+        # text field holding the keyboard focus; Ctrl+Z then edits its text
+        self._text_focus: ft.TextField | None = None
         self.editing_entry_id: str | None = None
         self._draft_entry: Entry | None = None
         self._absence_editor_dialog: ft.AlertDialog | None = None
@@ -126,6 +137,7 @@ class TrackerApp:
         self._tab_navigation = tabs_navigation
 
         self.page.on_disconnect = self._handle_page_disconnect
+        self.page.on_keyboard_event = self._handle_keyboard
         self._tab_content_container = ft.Container(
             expand=True,
             content=self._tab_views[self._active_tab_index],
@@ -135,21 +147,59 @@ class TrackerApp:
         self._start_ticker()
 
     def _setup_storage(self) -> None:
-        entries_dir = self.data_dir / "entries"
-        absences_dir = self.data_dir / "absences"
-        self.absence_storage = AbsenceStorage(base_dir=absences_dir)
-        stored_absences = self.absence_storage.load_all()
-        if stored_absences:
-            self.config.absences = stored_absences
+        self._release_session()
+        session = registry.acquire(self.data_dir, self.config)
+        self._session = session
+        self.state: TrackerState = session.state
+        self.absence_storage = session.absence_storage
+        self.events = session.events
+        # Per session: Ctrl+Z in one tab must not undo another tab's edit.
+        self.history = session.new_history()
+        self.absence_retriever = AbsenceIndex()
+        if session.absences:
+            self.config.absences = list(session.absences)
         else:
             self.config.absences = getattr(self.config, "absences", [])
             if self.config.absences:
-                self._persist_absences()
-        self.absence_retriever = ConfigAbsenceRetriever(self.config)
-        self.state = TrackerState(EntryStorage(base_dir=entries_dir))
+                self._persist_absences(undoable=False)
+        self.absence_retriever.rebuild(self.config.absences)
+        self.ledger = DailyLedger(
+            entry_retriever=self.state,
+            absence_retriever=self.absence_retriever,
+            config=self.config,
+            events=session.events,
+        )
+        self.day_cache = DayDetailsCache(events=session.events)
+        self._unsubscribe = session.events.subscribe(self._handle_shared_change)
+
+    def _release_session(self) -> None:
+        for derived in (getattr(self, "ledger", None), getattr(self, "day_cache", None)):
+            if derived is not None:
+                derived.close()
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._session is not None:
+            registry.release(self._session)
+            self._session = None
+
+    def _handle_shared_change(self, event: ChangeEvent) -> None:
+        if isinstance(event, AbsencesChanged) and self._session is not None:
+            self.config.absences = list(self._session.absences)
+            self.absence_retriever.rebuild(self.config.absences)
+        if getattr(self, "_tab_content_container", None) is not None and hasattr(self.page, "run_task"):
+            self.page.run_task(self._refresh_if_stale)
+
+    async def _refresh_if_stale(self) -> None:
+        # The session that made the change refreshes itself right away;
+        # only the other attached sessions still lag behind here.
+        if self._session is not None and self._seen_revision != self._session.revision:
+            self.refresh_all()
 
     # ------------------------------------------------------------------
     def refresh_all(self) -> None:
+        if self._session is not None:
+            self._seen_revision = self._session.revision
         now = datetime.now()
         today_view.refresh(self, now)
         week_view.refresh(self, now)
@@ -196,15 +246,7 @@ class TrackerApp:
         week_start = self._week_start_for(target_date)
         week_end = week_start + timedelta(days=6)
         week_end = self._clamp_range_end(week_start, week_end, limit_end)
-        result = get_week_summary(
-            week_start,
-            week_end,
-            entry_retriever=self.state,
-            absence_retriever=self.absence_retriever,
-            config=self.config,
-            now=now,
-        )
-        return result.summary
+        return self.ledger.summary(week_start, week_end, now=now)
 
     def _compute_month_summary(
         self, target_date: date, now: datetime, *, limit_end: date | None = None
@@ -213,15 +255,7 @@ class TrackerApp:
         _, days_in_month = monthrange(month_start.year, month_start.month)
         month_end = month_start + timedelta(days=days_in_month - 1)
         month_end = self._clamp_range_end(month_start, month_end, limit_end)
-        result = get_month_summary(
-            month_start,
-            month_end,
-            entry_retriever=self.state,
-            absence_retriever=self.absence_retriever,
-            config=self.config,
-            now=now,
-        )
-        return result.summary
+        return self.ledger.summary(month_start, month_end, now=now)
 
     def _compute_year_summary(
         self, year: int, now: datetime, *, limit_end: date | None = None
@@ -229,15 +263,7 @@ class TrackerApp:
         year_start = date(year, 1, 1)
         year_end = date(year, 12, 31)
         year_end = self._clamp_range_end(year_start, year_end, limit_end)
-        result = get_year_summary(
-            year_start,
-            year_end,
-            entry_retriever=self.state,
-            absence_retriever=self.absence_retriever,
-            config=self.config,
-            now=now,
-        )
-        return result.summary
+        return self.ledger.summary(year_start, year_end, now=now)
 
     @staticmethod
     def _clamp_range_end(start: date, default_end: date, limit_end: date | None) -> date:
@@ -321,6 +347,7 @@ class TrackerApp:
     # Timer helpers
     async def _handle_page_disconnect(self, _: ft.ControlEvent) -> None:
         self._stop_ticker()
+        self._release_session()
 
     def _start_ticker(self) -> None:
         if self._ticker_task is None and hasattr(self.page, "run_task"):
@@ -343,12 +370,59 @@ class TrackerApp:
     # UI factories
     # Week helpers (legacy history controls removed)
 
-    def _persist_absences(self) -> None:
+    def _persist_absences(self, *, undoable: bool = True) -> None:
         self.config.absences.sort(key=lambda r: (r.start, r.end or r.start, r.reason))
-        self.absence_storage.save_rules(self.config.absences)
+        self.absence_retriever.rebuild(self.config.absences)
+        if self._session is not None:
+            self._session.save_absences(self.config.absences, history=self.history if undoable else None)
+
+    # ------------------------------------------------------------------
+    # Undo / redo
+    def undo(self, expected: Optional[Edit] = None) -> None:
+        """Undo the newest edit; with ``expected``, only if that edit is still the newest."""
+        self._step_history(redo=False, expected=expected)
+
+    def redo(self) -> None:
+        self._step_history(redo=True)
+
+    def _step_history(self, *, redo: bool, expected: Optional[Edit] = None) -> None:
+        if self._session is None:
+            return
+        try:
+            edit = self.history.redo() if redo else self.history.undo(expected)
+        except ValueError as exc:
+            self._show_message(str(exc))
+            return
+        if edit is None:
+            self._show_message("Nothing to redo." if redo else "Nothing to undo.")
+            return
+        self.editing_entry_id = None
+        self.refresh_all()
+
+    def _handle_keyboard(self, event: ft.KeyboardEvent) -> None:
+        if self._text_focus is not None:
+            return
+        if event.key.lower() == "z" and (event.ctrl or event.meta):
+            self._step_history(redo=event.shift)
+
+    def track_text_focus(self, *fields: ft.TextField) -> None:
+        """Leave Ctrl+Z to the fields' own text editing while one of them has focus."""
+        for field in fields:
+            field.on_focus = partial(self._on_text_focus, field, True)
+            field.on_blur = partial(self._on_text_focus, field, False)
+
+    def _on_text_focus(self, field: ft.TextField, focused: bool, _: ft.ControlEvent) -> None:
+        if focused:
+            self._text_focus = field
+        elif self._text_focus is field:
+            self._text_focus = None
 
     def _on_timer_tick(self) -> None:
-        today_view.refresh(self, datetime.now())
+        now = datetime.now()
+        if now.date() != self._ticker_day:
+            self._ticker_day = now.date()
+            self.state.close_overnight_entries()
+        today_view.refresh(self, now)
         self.page.update()
 
     def _show_message(self, message: str) -> None:
@@ -356,6 +430,15 @@ class TrackerApp:
         self.page.snack_bar.open = True
         self.page.update()
 
+    def _show_undo_message(self, message: str) -> None:
+        # Undo only the edit announced here, not whatever was recorded after it.
+        edit = self.history.latest
+        self.page.snack_bar = ft.SnackBar(
+            ft.Text(message), action="Undo", on_action=lambda _: self.undo(edit)
+        )
+        self.page.snack_bar.open = True
+        self.page.update()
+
 
 def run_app(page: ft.Page) -> None:
     TrackerApp(page).mount()
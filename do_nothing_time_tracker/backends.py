@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from .models import StorageBackend
+from .models import StorageOptions
+from .sqlite_storage import migrate_json_to_sqlite
+from .sqlite_storage import open_sqlite_storages
+from .storage import AbsenceStorage
+from .storage import AbsenceStore
+from .storage import EntryStorage
+from .storage import EntryStore
+from .storage import get_codec
+from pathlib import Path
+
+
+def open_storages(data_dir: Path, options: StorageOptions | None = None) -> tuple[AbsenceStore, EntryStore]:
+    """Build the absence and entry storages selected by ``options`` for ``data_dir``."""
+    options = options or StorageOptions()
+    data_dir = Path(data_dir)
+    if options.backend == StorageBackend.SQLITE:
+        entry_storage, absence_storage = open_sqlite_storages(data_dir, options.fsync_policy)
+        migrate_json_to_sqlite(data_dir, entry_storage, absence_storage)
+        return absence_storage, entry_storage
+    codec = get_codec(options.json_codec)
+    absence_storage = AbsenceStorage(
+        base_dir=data_dir / "absences",
+        snapshot_cache=options.snapshot_cache,
+        codec=codec,
+        indent=not options.compact_json,
+        load_workers=options.load_workers,
+        fsync_policy=options.fsync_policy,
+        fsync_interval=options.fsync_interval,
+    )
+    entry_storage = EntryStorage(
+        base_dir=data_dir / "entries",
+        journal=options.journal,
+        snapshot_cache=options.snapshot_cache,
+        codec=codec,
+        indent=not options.compact_json,
+        load_workers=options.load_workers,
+        fsync_policy=options.fsync_policy,
+        fsync_interval=options.fsync_interval,
+        archive=options.archive_closed_years,
+        archive_compression=options.archive_compression,
+        month_format=options.month_format,
+    )
+    return absence_storage, entry_storage
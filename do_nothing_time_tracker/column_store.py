@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from .columnar import OPEN_END
+from .events import ChangeEvent
+from .events import EntriesChanged
+from .models import Entry
+from .models import EPOCH
+from .state import TrackerState
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import threading
+
+try:  # pragma: no cover - optional speedup
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+_EPOCH_DAY = EPOCH.date().toordinal()
+_MINUTES_PER_DAY = 24 * 60
+
+
+def epoch_day(value: date) -> int:
+    return value.toordinal() - _EPOCH_DAY
+
+
+class EntryColumnStore:
+    """
+    NumPy mirror of a :class:`TrackerState` for range aggregation.
+
+    Entries are held as start-sorted ``starts``/``ends`` epoch-minute arrays
+    (``ends`` is :data:`~.columnar.OPEN_END` for a running entry) plus the
+    epoch ``days`` they start on, so worked hours over years of history are
+    a slice and a ``bincount`` instead of one Python call per entry.
+
+    The store subscribes to the state's change events. Changed ids are
+    queued and folded in on the next query: their old rows are dropped,
+    their current versions appended and the arrays re-sorted once.
+    Requires ``numpy`` (the ``analytics`` extra).
+    """
+
+    def __init__(self, state: TrackerState) -> None:
+        if np is None:
+            raise RuntimeError("EntryColumnStore requires numpy; install the 'analytics' extra.")
+        self.state = state
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._unsubscribe = state.events.subscribe(self._handle_change)
+        self._set_rows(state.all_entries())
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._ids)
+
+    def close(self) -> None:
+        self._unsubscribe()
+
+    def entries_for_day(self, target: date) -> Tuple[Entry, ...]:
+        with self._lock:
+            self._sync()
+            lower, upper = self._day_bounds(epoch_day(target), epoch_day(target))
+            ids = self._ids[lower:upper].tolist()
+            starts = self._starts[lower:upper].tolist()
+            ends = self._ends[lower:upper].tolist()
+        build = Entry.from_minutes
+        return tuple(
+            build(entry_id, start, None if end == OPEN_END else end)
+            for entry_id, start, end in zip(ids, starts, ends)
+        )
+
+    def worked_hours_by_day(self, start: date, end: date, *, now: Optional[datetime] = None) -> np.ndarray:
+        """
+        Hours worked on each day from ``start`` to ``end`` inclusive, as a float array.
+
+        Like ``summarize_day``, a running entry only counts up to ``now``
+        when it started today, and every entry counts on its start day.
+        """
+        first, last = epoch_day(start), epoch_day(end)
+        if last < first:
+            return np.zeros(0)
+        with self._lock:
+            self._sync()
+            lower, upper = self._day_bounds(first, last)
+            starts = self._starts[lower:upper]
+            ends = self._ends[lower:upper]
+            days = self._days[lower:upper]
+        minutes = (ends - starts).astype(np.float64)
+        running = ends == OPEN_END
+        if running.any():
+            minutes[running] = 0.0
+            if now is not None:
+                today = running & (days == epoch_day(date.today()))
+                now_minutes = (now - EPOCH).total_seconds() / 60
+                minutes[today] = now_minutes - starts[today]
+        np.maximum(minutes, 0.0, out=minutes)
+        return np.bincount(days - first, weights=minutes, minlength=last - first + 1) / 60
+
+    def worked_hours(self, start: date, end: date, *, now: Optional[datetime] = None) -> float:
+        return float(self.worked_hours_by_day(start, end, now=now).sum())
+
+    # ------------------------------------------------------------------
+    def _handle_change(self, event: ChangeEvent) -> None:
+        if isinstance(event, EntriesChanged):
+            with self._lock:
+                self._pending.update(event.entry_ids)
+
+    def _sync(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, set()
+        keep = ~np.isin(self._ids, list(pending))
+        current = [entry for entry in map(self.state.find_entry, pending) if entry is not None]
+        self._set_rows(
+            current,
+            ids=self._ids[keep],
+            starts=self._starts[keep],
+            ends=self._ends[keep],
+        )
+
+    def _set_rows(
+        self,
+        entries: List[Entry],
+        *,
+        ids: Optional[np.ndarray] = None,
+        starts: Optional[np.ndarray] = None,
+        ends: Optional[np.ndarray] = None,
+    ) -> None:
+        new_ids = np.array([entry.id for entry in entries], dtype=object)
+        new_starts = np.fromiter((entry.start_minutes for entry in entries), np.int64, len(entries))
+        new_ends = np.fromiter(
+            (OPEN_END if entry.end_minutes is None else entry.end_minutes for entry in entries),
+            np.int64,
+            len(entries),
+        )
+        if ids is not None:
+            new_ids = np.concatenate((ids, new_ids))
+            new_starts = np.concatenate((starts, new_starts))
+            new_ends = np.concatenate((ends, new_ends))
+        order = np.argsort(new_starts, kind="stable")
+        self._ids = new_ids[order]
+        self._starts = new_starts[order]
+        self._ends = new_ends[order]
+        self._days = self._starts // _MINUTES_PER_DAY
+
+    def _day_bounds(self, first: int, last: int) -> Tuple[int, int]:
+        lower = int(np.searchsorted(self._days, first, side="left"))
+        upper = int(np.searchsorted(self._days, last, side="right"))
+        return lower, upper
+
+
+@dataclass
+class ColumnEntryRetriever:
+    """
+    ``EntryRetriever`` over an :class:`EntryColumnStore`.
+
+    Serves ``entries_for_day`` from the columns and exposes the vectorized
+    ``worked_hours_by_day`` for callers that only need totals.
+    """
+
+    store: EntryColumnStore
+
+    def entries_for_day(self, target: date) -> Tuple[Entry, ...]:
+        return self.store.entries_for_day(target)
+
+    def worked_hours_by_day(self, start: date, end: date, *, now: Optional[datetime] = None) -> np.ndarray:
+        return self.store.worked_hours_by_day(start, end, now=now)
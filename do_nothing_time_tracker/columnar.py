@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from .models import Entry
+from array import array
+from pathlib import Path
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import TYPE_CHECKING
+
+import mmap
+import struct
+import sys
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing_extensions import Self
+
+COLUMNAR_SUFFIX = ".cols"
+OPEN_END = -(2**31)
+"""``ends`` value of an entry that is still running."""
+
+# magic, format version, reserved, entry count; all columns are little-endian
+_HEADER = struct.Struct("<4sHHI")
+_MAGIC = b"DNTC"
+_VERSION = 1
+
+
+def encode_columns(entries: Iterable[Entry]) -> bytes:
+    """
+    Encode a month as a columnar file.
+
+    Layout after the header: ``count`` int32 start minutes, ``count`` int32
+    end minutes (:data:`OPEN_END` for running entries), ``count + 1`` uint32
+    offsets into the trailing UTF-8 id blob.
+    """
+    entries = list(entries)
+    starts = array("i", (entry.start_minutes for entry in entries))
+    ends = array("i", (OPEN_END if entry.end_minutes is None else entry.end_minutes for entry in entries))
+    ids = [entry.id.encode("utf-8") for entry in entries]
+    offsets = array("I", [0])
+    for raw in ids:
+        offsets.append(offsets[-1] + len(raw))
+    if sys.byteorder != "little":  # pragma: no cover - big-endian hosts
+        for column in (starts, ends, offsets):
+            column.byteswap()
+    header = _HEADER.pack(_MAGIC, _VERSION, 0, len(entries))
+    return b"".join((header, starts.tobytes(), ends.tobytes(), offsets.tobytes(), *ids))
+
+
+class MonthColumns:
+    """
+    Read-only view over a columnar month file.
+
+    ``starts`` and ``ends`` are int32 epoch-minute sequences served straight
+    from the memory-mapped file, so scans do not build ``Entry`` objects.
+    Close the view (or use it as a context manager) to release the mapping.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a columnar month file")
+        self.count = count
+        self._view = view = memoryview(self._mmap)
+        offset = _HEADER.size
+        width = 4 * count
+        self.starts: Sequence[int] = self._column(view[offset : offset + width], "i")
+        self.ends: Sequence[int] = self._column(view[offset + width : offset + 2 * width], "i")
+        offset += 2 * width
+        self._offsets: Sequence[int] = self._column(view[offset : offset + width + 4], "I")
+        self._ids_start = offset + width + 4
+
+    @staticmethod
+    def _column(raw: memoryview, typecode: str) -> Sequence[int]:
+        if sys.byteorder == "little":
+            return raw.cast(typecode)
+        column = array(typecode, raw)  # pragma: no cover - big-endian hosts
+        column.byteswap()  # pragma: no cover
+        return column  # pragma: no cover
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def entry_id(self, index: int) -> str:
+        lower = self._ids_start + self._offsets[index]
+        upper = self._ids_start + self._offsets[index + 1]
+        return self._mmap[lower:upper].decode("utf-8")
+
+    def ids(self) -> List[str]:
+        offsets = list(self._offsets)
+        blob = self._mmap[self._ids_start : self._ids_start + offsets[-1]]
+        text = blob.decode("utf-8")
+        if len(text) == len(blob):
+            # ASCII ids (the generated ones are): byte offsets are character offsets.
+            return [text[lower:upper] for lower, upper in zip(offsets, offsets[1:])]
+        return [blob[lower:upper].decode("utf-8") for lower, upper in zip(offsets, offsets[1:])]
+
+    def entries(self) -> List[Entry]:
+        build = Entry.from_minutes
+        return [
+            build(entry_id, start, None if end == OPEN_END else end)
+            for entry_id, start, end in zip(self.ids(), self.starts, self.ends)
+        ]
+
+    def close(self) -> None:
+        for column in (self.starts, self.ends, self._offsets):
+            if isinstance(column, memoryview):
+                column.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def read_columns(path: Path) -> Optional[MonthColumns]:
+    """Open ``path`` as :class:`MonthColumns`, or return ``None`` when it does not exist."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return MonthColumns(path)
+
+
+def decode_columns(path: Path) -> List[Entry]:
+    with MonthColumns(path) as columns:
+        return columns.entries()
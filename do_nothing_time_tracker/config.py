@@ -2,7 +2,15 @@ from __future__ import annotations
 
 from .models import AbsenceRule
 from .models import Config
+from .models import FsyncPolicy
+from .models import OverlapPolicy
+from .models import StorageBackend
+from .models import StorageOptions
 from .models import SummaryExpectedMode
+from .storage import ARCHIVE_FORMATS
+from .storage import atomic_write_bytes
+from .storage import get_codec
+from .storage import MONTH_FORMATS
 from datetime import date
 from pathlib import Path
 
@@ -74,6 +82,10 @@ class ConfigService:
             summary_mode = SummaryExpectedMode(mode_raw)
         except ValueError:
             summary_mode = SummaryExpectedMode.FULL_PERIOD
+        try:
+            overlap_policy = OverlapPolicy(payload.get("overlap_policy", OverlapPolicy.REJECT.value))
+        except ValueError:
+            overlap_policy = OverlapPolicy.REJECT
 
         data_dir_raw = payload.get("data_dir")
         data_dir = self.normalize_data_dir(data_dir_raw) if data_dir_raw else None
@@ -84,13 +96,19 @@ class ConfigService:
             absences=absences,
             summary_expected_mode=summary_mode,
             data_dir=data_dir,
+            overlap_policy=overlap_policy,
+            storage=load_storage_options(payload.get("storage") or {}),
         )
 
     def save(self, config: Config) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         payload = serialize_config(config, default_data_dir=self.default_data_dir())
-        with self.path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2)
+        codec = get_codec(config.storage.json_codec)
+        atomic_write_bytes(
+            self.path,
+            codec.dumps(payload, indent=not config.storage.compact_json),
+            fsync=config.storage.fsync_policy != FsyncPolicy.NEVER,
+        )
 
 
 def serialize_config(config: Config, *, default_data_dir: Path | None = None) -> dict:
@@ -98,6 +116,7 @@ def serialize_config(config: Config, *, default_data_dir: Path | None = None) ->
         "hours_per_day": config.hours_per_day,
         "workdays": config.workdays,
         "summary_expected_mode": config.summary_expected_mode.value,
+        "overlap_policy": config.overlap_policy.value,
         "absences": [
             {
                 "start": rule.start.isoformat(),
@@ -107,6 +126,7 @@ def serialize_config(config: Config, *, default_data_dir: Path | None = None) ->
             }
             for rule in config.absences
         ],
+        "storage": serialize_storage_options(config.storage),
     }
     if config.data_dir:
         resolved_value = Path(config.data_dir).expanduser().resolve()
@@ -114,3 +134,56 @@ def serialize_config(config: Config, *, default_data_dir: Path | None = None) ->
         if default_value is None or resolved_value != default_value:
             payload["data_dir"] = str(resolved_value)
     return payload
+
+
+def load_storage_options(payload: dict) -> StorageOptions:
+    defaults = StorageOptions()
+    try:
+        backend = StorageBackend(payload.get("backend", defaults.backend.value))
+    except ValueError:
+        backend = defaults.backend
+    try:
+        fsync_policy = FsyncPolicy(payload.get("fsync_policy", defaults.fsync_policy.value))
+    except ValueError:
+        fsync_policy = defaults.fsync_policy
+    archive_compression = str(payload.get("archive_compression", defaults.archive_compression))
+    if archive_compression not in ARCHIVE_FORMATS:
+        archive_compression = defaults.archive_compression
+    month_format = str(payload.get("month_format", defaults.month_format))
+    if month_format not in MONTH_FORMATS:
+        month_format = defaults.month_format
+    return StorageOptions(
+        backend=backend,
+        journal=bool(payload.get("journal", defaults.journal)),
+        lazy_load=bool(payload.get("lazy_load", defaults.lazy_load)),
+        snapshot_cache=bool(payload.get("snapshot_cache", defaults.snapshot_cache)),
+        json_codec=str(payload.get("json_codec", defaults.json_codec)),
+        compact_json=bool(payload.get("compact_json", defaults.compact_json)),
+        load_workers=max(int(payload.get("load_workers", defaults.load_workers)), 1),
+        flush_delay=max(float(payload.get("flush_delay", defaults.flush_delay)), 0.0),
+        max_unflushed=max(float(payload.get("max_unflushed", defaults.max_unflushed)), 0.0),
+        fsync_policy=fsync_policy,
+        fsync_interval=max(float(payload.get("fsync_interval", defaults.fsync_interval)), 0.0),
+        archive_closed_years=bool(payload.get("archive_closed_years", defaults.archive_closed_years)),
+        archive_compression=archive_compression,
+        month_format=month_format,
+    )
+
+
+def serialize_storage_options(options: StorageOptions) -> dict:
+    return {
+        "backend": options.backend.value,
+        "journal": options.journal,
+        "lazy_load": options.lazy_load,
+        "snapshot_cache": options.snapshot_cache,
+        "json_codec": options.json_codec,
+        "compact_json": options.compact_json,
+        "load_workers": options.load_workers,
+        "flush_delay": options.flush_delay,
+        "max_unflushed": options.max_unflushed,
+        "fsync_policy": options.fsync_policy.value,
+        "fsync_interval": options.fsync_interval,
+        "archive_closed_years": options.archive_closed_years,
+        "archive_compression": options.archive_compression,
+        "month_format": options.month_format,
+    }
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from .models import AbsenceRule
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EntriesChanged:
+    """Entries were added, edited or removed; ``first_day``..``last_day`` covers old and new dates."""
+
+    entry_ids: Tuple[str, ...]
+    first_day: date
+    last_day: date
+
+    def touches(self, start: date, end: date) -> bool:
+        return self.first_day <= end and start <= self.last_day
+
+
+@dataclass(frozen=True)
+class AbsencesChanged:
+    """Absence rules covering ``first_day``..``last_day`` were added, edited or removed."""
+
+    first_day: date
+    last_day: date
+
+    def touches(self, start: date, end: date) -> bool:
+        return self.first_day <= end and start <= self.last_day
+
+
+def absence_change(
+    previous: Iterable[AbsenceRule],
+    current: Iterable[AbsenceRule],
+) -> Optional[AbsencesChanged]:
+    """Describe the dates affected by going from ``previous`` to ``current`` rules, if any."""
+
+    def key(rule: AbsenceRule) -> tuple:
+        return rule.start, rule.end or rule.start, rule.reason, rule.hours
+
+    changed = {key(rule) for rule in previous} ^ {key(rule) for rule in current}
+    if not changed:
+        return None
+    return AbsencesChanged(
+        first_day=min(item[0] for item in changed),
+        last_day=max(item[1] for item in changed),
+    )
+
+
+ChangeEvent = Union[EntriesChanged, AbsencesChanged]
+Subscriber = Callable[[ChangeEvent], None]
+
+
+class ChangeBus:
+    """
+    Synchronous publish/subscribe hub for :data:`ChangeEvent` values.
+
+    Subscribers run on the publishing thread, after the change is applied.
+    A failing subscriber is logged and does not stop the others.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """Register ``subscriber``; returns a callable that unsubscribes it."""
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    def publish(self, event: ChangeEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(event)
+            except Exception:  # noqa: BLE001
+                logger.exception("Change subscriber %r failed", subscriber)
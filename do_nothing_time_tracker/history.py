@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from .models import AbsenceRule
+from .models import Entry
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import threading
+
+
+@dataclass(frozen=True)
+class EntryEdit:
+    """
+    The entries one mutation touched, as ``(before, after)`` pairs.
+
+    ``None`` on either side means the entry did not exist, so a delete is
+    ``(entry, None)`` and an insert ``(None, entry)``.
+    """
+
+    changes: Tuple[Tuple[Optional[Entry], Optional[Entry]], ...]
+
+    def reversed(self) -> EntryEdit:
+        return EntryEdit(tuple((after, before) for before, after in self.changes))
+
+
+@dataclass(frozen=True)
+class AbsenceEdit:
+    """Absence rules removed and added by one save of the rule list."""
+
+    removed: Tuple[AbsenceRule, ...]
+    added: Tuple[AbsenceRule, ...]
+
+    def reversed(self) -> AbsenceEdit:
+        return AbsenceEdit(removed=self.added, added=self.removed)
+
+
+Edit = Union[EntryEdit, AbsenceEdit]
+EditHandler = Callable[[Edit], None]
+
+
+class EditHistory:
+    """
+    Bounded undo/redo log of :data:`Edit` deltas.
+
+    Owners register a handler per edit type that applies a (reversed) edit;
+    ``undo``/``redo`` pass it the delta to apply and move the edit to the
+    other stack. Recording a new edit clears the redo stack. Only the
+    newest ``limit`` edits are kept.
+    """
+
+    def __init__(self, limit: int = 100) -> None:
+        self.limit = limit
+        self._undo: Deque[Edit] = deque(maxlen=limit)
+        self._redo: List[Edit] = []
+        self._handlers: Dict[type, EditHandler] = {}
+        self._lock = threading.Lock()
+
+    def register(self, kind: type, handler: EditHandler) -> None:
+        self._handlers[kind] = handler
+
+    def record(self, edit: Edit) -> None:
+        with self._lock:
+            self._undo.append(edit)
+            self._redo.clear()
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def latest(self) -> Optional[Edit]:
+        """The edit the next ``undo`` reverts."""
+        with self._lock:
+            return self._undo[-1] if self._undo else None
+
+    def undo(self, expected: Optional[Edit] = None) -> Optional[Edit]:
+        """
+        Revert the newest edit and return it, or ``None`` when there is nothing to undo.
+
+        With ``expected``, only that edit is reverted: a ``ValueError`` is
+        raised if it was undone already or newer edits were recorded since.
+        An edit whose data changed since (e.g. in another session) cannot be
+        reverted: it is dropped and the handler's ``ValueError`` propagates.
+        """
+        with self._lock:
+            if expected is not None and (not self._undo or self._undo[-1] is not expected):
+                raise ValueError("This change was already undone or newer changes were made since.")
+            if not self._undo:
+                return None
+            edit = self._undo.pop()
+        # Applied outside the lock: handlers take the owner's locks, and
+        # owners record edits while holding them.
+        self._handlers[type(edit)](edit.reversed())
+        with self._lock:
+            self._redo.append(edit)
+        return edit
+
+    def redo(self) -> Optional[Edit]:
+        """Re-apply the newest undone edit and return it, or ``None`` when there is nothing to redo."""
+        with self._lock:
+            if not self._redo:
+                return None
+            edit = self._redo.pop()
+        self._handlers[type(edit)](edit)
+        with self._lock:
+            self._undo.append(edit)
+        return edit
+
+    def clear(self) -> None:
+        with self._lock:
+            self._undo.clear()
+            self._redo.clear()
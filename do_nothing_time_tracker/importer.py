@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from .models import AbsenceRule
 from .models import Entry
+from .models import OverlapPolicy
+from .state import TrackerState
 from .storage import AbsenceStorage
 from .storage import EntryStorage
 from collections import defaultdict
@@ -22,7 +24,12 @@ import uuid
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Import legacy XLSX exports into monthly JSON files.")
+    parser = argparse.ArgumentParser(
+        description=(
+            "Import legacy XLSX exports into monthly JSON files. Entries still running in the target "
+            "directory are left open, and its open-months.hint file is created or updated."
+        )
+    )
     parser.add_argument("xlsx", type=Path, help="Path to the XLSX export")
     parser.add_argument(
         "--output-dir",
@@ -53,6 +60,12 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Ignore column W even if it contains absence information",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of threads used to read existing month files when merging",
+    )
     parser.add_argument(
         "--skip-exceptions",
         dest="skip_absences",
@@ -127,15 +140,36 @@ def iter_entries_from_row(row, day: date) -> Iterable[Entry]:
         yield Entry(id=str(uuid.uuid4()), start=start_dt, end=end_dt)
 
 
-def merge_existing(entries_by_month: Dict[str, List[Entry]], output_dir: Path, overwrite: bool) -> None:
-    storage = EntryStorage(base_dir=output_dir)
+def merge_existing(entries_by_month: Dict[str, List[Entry]], state: TrackerState, overwrite: bool) -> None:
+    """Add the entries already in ``state`` to ``entries_by_month`` unless ``overwrite`` is set."""
     if overwrite:
         return
-    for key, existing in storage.load_all().items():
-        entries_by_month.setdefault(key, []).extend(existing)
+    for entry in state.all_entries():
+        key = EntryStorage.month_key_from_date(entry.start.date())
+        entries_by_month.setdefault(key, []).append(entry)
+
 
+def write_months(
+    entries_by_month: Dict[str, List[Entry]],
+    output_dir: Path,
+    state: Optional[TrackerState] = None,
+) -> None:
+    """
+    Replace the stored contents of every month in ``entries_by_month``.
 
-def write_months(entries_by_month: Dict[str, List[Entry]], output_dir: Path) -> None:
+    With a ``state`` the months go through :meth:`TrackerState.apply_batch`,
+    so an open tracker sees the import and each month is persisted once.
+    """
+    if state is not None:
+        saves = [entry for entries in entries_by_month.values() for entry in entries]
+        replaced = {
+            entry.id
+            for key in entries_by_month
+            for entry in state.entries_for_month(*EntryStorage.year_month_from_key(key))
+        }
+        touched = state.apply_batch(saves, replaced - {entry.id for entry in saves})
+        print(f"Wrote {len(saves)} entries to {len(touched)} month(s)")
+        return
     storage = EntryStorage(base_dir=output_dir)
     for key, entries in entries_by_month.items():
         entries.sort(key=lambda entry: entry.start)
@@ -208,21 +242,32 @@ def main(argv: list[str] | None = None) -> None:
 
     entries_by_month: Dict[str, List[Entry]] = defaultdict(list)
     absences: List[Tuple[date, str, Optional[int]]] = []
-    merge_existing(entries_by_month, args.output_dir, args.overwrite)
+    # The legacy export is taken as-is, overlaps included, like the month files it replaces;
+    # entries still running in the target directory are the tracker's business, not ours.
+    state = TrackerState(
+        EntryStorage(base_dir=args.output_dir, load_workers=args.workers),
+        lazy=True,
+        overlap_policy=OverlapPolicy.ALLOW,
+        close_overnight=False,
+    )
+    try:
+        merge_existing(entries_by_month, state, args.overwrite)
 
-    for row in sheet.iter_rows(min_row=args.start_row, values_only=True):
-        day = normalize_date(row[0])
-        if day is None:
-            continue
-        for entry in iter_entries_from_row(row, day):
-            key = entry.start.strftime("%Y-%m")
-            entries_by_month[key].append(entry)
-        if not args.skip_absences and len(row) > 22:
-            maybe_absence = extract_absence(row, day, row[1], row[22])
-            if maybe_absence:
-                absences.append(maybe_absence)
-
-    write_months(entries_by_month, args.output_dir)
+        for row in sheet.iter_rows(min_row=args.start_row, values_only=True):
+            day = normalize_date(row[0])
+            if day is None:
+                continue
+            for entry in iter_entries_from_row(row, day):
+                key = entry.start.strftime("%Y-%m")
+                entries_by_month[key].append(entry)
+            if not args.skip_absences and len(row) > 22:
+                maybe_absence = extract_absence(row, day, row[1], row[22])
+                if maybe_absence:
+                    absences.append(maybe_absence)
+
+        write_months(entries_by_month, args.output_dir, state=state)
+    finally:
+        state.close()
     if not args.skip_absences:
         append_absences(absences, args.absences_dir)
 
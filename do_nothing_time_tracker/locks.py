@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import threading
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or a single writer.
+
+    The write side is reentrant and its holder may also read. Reads nest
+    freely, but a reader cannot upgrade to a writer. Waiting writers block
+    new readers, so a steady stream of ticker refreshes cannot starve saves.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def _read_stack(self) -> List[bool]:
+        # One flag per read hold of this thread: whether it counts in ``_readers``.
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def acquire_read(self) -> None:
+        stack = self._read_stack()
+        counted = not stack and self._writer != threading.get_ident()
+        if counted:
+            with self._cond:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        stack.append(counted)
+
+    def release_read(self) -> None:
+        if self._read_stack().pop():
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if self._read_stack():
+                raise RuntimeError("Cannot upgrade a read lock to a write lock.")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            if self._writer != threading.get_ident():
+                raise RuntimeError("Write lock released by a thread that does not hold it.")
+            self._writer_depth -= 1
+            if self._writer_depth:
+                return
+            self._writer = None
+            stack = self._read_stack()
+            if stack and not any(stack):
+                # Reads taken while writing outlive the write: count them now.
+                stack[0] = True
+                self._readers += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
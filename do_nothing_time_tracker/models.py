@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from dataclasses import field
 from datetime import date
 from datetime import datetime
+from datetime import timedelta
 from enum import Enum
 from pathlib import Path
 from typing import Dict
@@ -12,18 +13,59 @@ from typing import Optional
 
 import uuid
 
+EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = EPOCH.toordinal()
+_MINUTE = timedelta(minutes=1)
+
+
+def to_epoch_minutes(value: datetime) -> int:
+    """Whole minutes since :data:`EPOCH`; seconds are dropped, as they are in the stored files."""
+    return (value.toordinal() - _EPOCH_ORDINAL) * 1440 + value.hour * 60 + value.minute
+
 
-@dataclass
 class Entry:
-    """Represents a tracked time entry between two datetimes."""
+    """
+    Represents a tracked time entry between two datetimes.
+
+    Long histories hold tens of thousands of entries, so they are kept
+    compact: a slotted object with ``start`` and ``end`` stored as whole
+    minutes since :data:`EPOCH` (``start_minutes``/``end_minutes``) and
+    exposed as naive datetimes. Seconds are dropped on construction, the
+    same precision the month files have always stored. Treat entries as
+    immutable; ``with_updates`` returns a new one.
+    """
+
+    __slots__ = ("end_minutes", "id", "start_minutes")
 
     id: str
-    start: datetime
-    end: Optional[datetime] = None
+    start_minutes: int
+    end_minutes: Optional[int]
+
+    def __init__(self, id: str, start: datetime, end: Optional[datetime] = None) -> None:
+        self.id = id
+        self.start_minutes = to_epoch_minutes(start)
+        self.end_minutes = None if end is None else to_epoch_minutes(end)
+
+    @classmethod
+    def from_minutes(cls, id: str, start: int, end: Optional[int] = None) -> Entry:
+        """Build an entry straight from epoch minutes, without going through datetimes."""
+        entry = cls.__new__(cls)
+        entry.id = id
+        entry.start_minutes = start
+        entry.end_minutes = end
+        return entry
+
+    @property
+    def start(self) -> datetime:
+        return EPOCH + _MINUTE * self.start_minutes
+
+    @property
+    def end(self) -> Optional[datetime]:
+        return None if self.end_minutes is None else EPOCH + _MINUTE * self.end_minutes
 
     @property
     def is_open(self) -> bool:
-        return self.end is None
+        return self.end_minutes is None
 
     @property
     def start_date(self) -> date:
@@ -31,10 +73,11 @@ class Entry:
 
     def duration_hours(self, now: Optional[datetime] = None) -> float:
         """Returns the number of hours worked for this entry."""
-        effective_end = self.end or now
-        if not effective_end:
+        if self.end_minutes is not None:
+            return max((self.end_minutes - self.start_minutes) / 60, 0.0)
+        if not now:
             return 0.0
-        seconds = (effective_end - self.start).total_seconds()
+        seconds = (now - self.start).total_seconds()
         return max(seconds / 3600, 0.0)
 
     def with_updates(
@@ -43,17 +86,18 @@ class Entry:
         start: Optional[datetime] = None,
         end: Optional[datetime] = None,
     ) -> Entry:
-        return Entry(
-            id=self.id,
-            start=start or self.start,
-            end=end if end is not None else self.end,
+        return Entry.from_minutes(
+            self.id,
+            self.start_minutes if start is None else to_epoch_minutes(start),
+            self.end_minutes if end is None else to_epoch_minutes(end),
         )
 
     def to_dict(self) -> Dict[str, Optional[str]]:
+        end = self.end
         return {
             "id": self.id,
             "start": self.start.isoformat(timespec="minutes"),
-            "end": self.end.isoformat(timespec="minutes") if self.end else None,
+            "end": end.isoformat(timespec="minutes") if end else None,
         }
 
     @classmethod
@@ -68,12 +112,68 @@ class Entry:
     def new(cls, start: datetime) -> Entry:
         return cls(id=str(uuid.uuid4()), start=start)
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Entry):
+            return NotImplemented
+        return (
+            self.id == other.id
+            and self.start_minutes == other.start_minutes
+            and self.end_minutes == other.end_minutes
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.start_minutes, self.end_minutes))
+
+    def __repr__(self) -> str:
+        return f"Entry(id={self.id!r}, start={self.start!r}, end={self.end!r})"
+
+    def __reduce__(self) -> tuple:
+        return Entry.from_minutes, (self.id, self.start_minutes, self.end_minutes)
+
 
 class SummaryExpectedMode(str, Enum):
     FULL_PERIOD = "full_period"
     TO_DATE = "to_date"
 
 
+class OverlapPolicy(str, Enum):
+    ALLOW = "allow"
+    REJECT = "reject"
+    TRIM = "trim"
+    MERGE = "merge"
+
+
+class StorageBackend(str, Enum):
+    JSON = "json"
+    SQLITE = "sqlite"
+
+
+class FsyncPolicy(str, Enum):
+    NEVER = "never"
+    ALWAYS = "always"
+    BATCH = "batch"
+
+
+@dataclass
+class StorageOptions:
+    """Tuning knobs for how entries and absences are persisted."""
+
+    backend: StorageBackend = StorageBackend.JSON
+    journal: bool = False
+    lazy_load: bool = False
+    snapshot_cache: bool = False
+    json_codec: str = "auto"
+    compact_json: bool = False
+    load_workers: int = 4
+    flush_delay: float = 0.0
+    max_unflushed: float = 5.0
+    fsync_policy: FsyncPolicy = FsyncPolicy.NEVER
+    fsync_interval: float = 1.0
+    archive_closed_years: bool = False
+    archive_compression: str = "gzip"
+    month_format: str = "json"
+
+
 @dataclass
 class Config:
     hours_per_day: int = 8
@@ -81,6 +181,8 @@ class Config:
     absences: List[AbsenceRule] = field(default_factory=list)
     summary_expected_mode: SummaryExpectedMode = SummaryExpectedMode.FULL_PERIOD
     data_dir: Path | None = None
+    overlap_policy: OverlapPolicy = OverlapPolicy.REJECT
+    storage: StorageOptions = field(default_factory=StorageOptions)
 
 
 @dataclass
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from .backends import open_storages
+from .events import absence_change
+from .events import ChangeBus
+from .events import ChangeEvent
+from .history import AbsenceEdit
+from .history import EditHistory
+from .history import EntryEdit
+from .models import AbsenceRule
+from .models import Config
+from .state import TrackerState
+from .storage import AbsenceStore
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import threading
+
+
+@dataclass
+class SharedSession:
+    """
+    Everything the sessions attached to one data directory share.
+
+    Undo histories are not shared: each session gets its own from
+    :meth:`new_history` and passes it to the mutations it makes.
+    """
+
+    data_dir: Path
+    state: TrackerState
+    absence_storage: AbsenceStore
+    events: ChangeBus
+    absences: List[AbsenceRule] = field(default_factory=list)
+    refs: int = 0
+    revision: int = 0
+    """Incremented for every published change; lets sessions skip redundant refreshes."""
+    _absence_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def new_history(self) -> EditHistory:
+        """An undo history for one session, able to revert entry and absence edits."""
+        history = EditHistory()
+        history.register(EntryEdit, self.state.apply_edit)
+        history.register(AbsenceEdit, self._apply_absence_edit)
+        return history
+
+    def save_absences(self, rules: Iterable[AbsenceRule], *, history: Optional[EditHistory] = None) -> None:
+        """Replace the absence rules, persisting only the changed years; ``history`` makes it undoable."""
+        rules = list(rules)
+        with self._absence_lock:
+            removed = _without(self.absences, rules)
+            added = _without(rules, self.absences)
+            if not removed and not added:
+                return
+            self._store_absences(rules, removed, added)
+            if history is not None:
+                history.record(AbsenceEdit(removed=tuple(removed), added=tuple(added)))
+        self._publish_absences(removed, added)
+
+    def _apply_absence_edit(self, edit: AbsenceEdit) -> None:
+        with self._absence_lock:
+            remaining = _without(self.absences, edit.removed)
+            if len(remaining) != len(self.absences) - len(edit.removed):
+                raise ValueError("The absences were changed since this edit; it can no longer be undone.")
+            self._store_absences([*remaining, *edit.added], edit.removed, edit.added)
+        self._publish_absences(edit.removed, edit.added)
+
+    def _store_absences(
+        self, rules: List[AbsenceRule], removed: Sequence[AbsenceRule], added: Sequence[AbsenceRule]
+    ) -> None:
+        rules.sort(key=lambda r: (r.start, r.end or r.start, r.reason))
+        self.absence_storage.save_years(rules, {rule.start.year for rule in [*removed, *added]})
+        self.absences = rules
+
+    def _publish_absences(self, removed: Sequence[AbsenceRule], added: Sequence[AbsenceRule]) -> None:
+        event = absence_change(removed, added)
+        if event is not None:
+            self.events.publish(event)
+
+    def _bump(self, _: ChangeEvent) -> None:
+        self.revision += 1
+
+
+def _without(rules: Iterable[AbsenceRule], removed: Iterable[AbsenceRule]) -> List[AbsenceRule]:
+    """``rules`` minus one occurrence of each rule in ``removed``."""
+    remaining = list(rules)
+    for rule in removed:
+        if rule in remaining:
+            remaining.remove(rule)
+    return remaining
+
+
+class StateRegistry:
+    """
+    Hands out one :class:`SharedSession` per resolved data directory.
+
+    The first ``acquire`` for a directory opens its storages and loads the
+    state; later ones only bump the reference count and close entries left
+    running overnight. The last ``release`` flushes and closes the state
+    while still holding the registry lock.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: Dict[Path, SharedSession] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, data_dir: Path, config: Config) -> SharedSession:
+        key = Path(data_dir).expanduser().resolve()
+        with self._lock:
+            session = self._sessions.get(key)
+            opened = session is None
+            if session is None:
+                session = self._open(key, config)
+                self._sessions[key] = session
+            session.refs += 1
+        if not opened:
+            # the shared state may have been open since before midnight
+            session.state.close_overnight_entries()
+        return session
+
+    def release(self, session: SharedSession) -> None:
+        with self._lock:
+            session.refs -= 1
+            if session.refs > 0:
+                return
+            if self._sessions.get(session.data_dir) is session:
+                del self._sessions[session.data_dir]
+            # Flush before giving up the lock so a reconnect cannot load stale files.
+            session.state.close()
+            session.absence_storage.sync()
+            session.absence_storage.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @staticmethod
+    def _open(data_dir: Path, config: Config) -> SharedSession:
+        absence_storage, entry_storage = open_storages(data_dir, config.storage)
+        events = ChangeBus()
+        state = TrackerState(
+            entry_storage,
+            lazy=config.storage.lazy_load,
+            flush_delay=config.storage.flush_delay,
+            max_unflushed=config.storage.max_unflushed,
+            overlap_policy=config.overlap_policy,
+            events=events,
+        )
+        session = SharedSession(
+            data_dir=data_dir,
+            state=state,
+            absence_storage=absence_storage,
+            events=events,
+            absences=absence_storage.load_all(),
+        )
+        events.subscribe(session._bump)
+        return session
+
+
+registry = StateRegistry()
+"""Process-wide registry used by every :class:`TrackerApp`."""
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+from .models import AbsenceRule
+from .models import Entry
+from .models import FsyncPolicy
+from .storage import _from_payload
+from .storage import _to_payload
+from .storage import AbsenceStorage
+from .storage import EntryStorage
+from calendar import monthrange
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import sqlite3
+import threading
+
+DATABASE_NAME = "tracker.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    "end" TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_start ON entries (start);
+CREATE INDEX IF NOT EXISTS idx_entries_open ON entries (id) WHERE "end" IS NULL;
+CREATE TABLE IF NOT EXISTS absences (
+    start TEXT NOT NULL,
+    "end" TEXT,
+    reason TEXT NOT NULL DEFAULT '',
+    hours INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_absences_start ON absences (start);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+_MIGRATED_KEY = "json_migrated"
+# In WAL mode NORMAL keeps the database consistent on power loss and may only
+# drop the latest commits; OFF could corrupt it, so even "never" maps to NORMAL.
+_SYNCHRONOUS_BY_POLICY = {
+    FsyncPolicy.NEVER: "NORMAL",
+    FsyncPolicy.BATCH: "NORMAL",
+    FsyncPolicy.ALWAYS: "FULL",
+}
+
+
+def _format_minutes(value: datetime) -> str:
+    # Same representation as Entry.to_dict so lexical order matches time order.
+    return value.isoformat(timespec="minutes")
+
+
+def _month_bounds(key: str) -> tuple[str, str]:
+    year, month = EntryStorage.year_month_from_key(key)
+    start = date(year, month, 1)
+    end = start + timedelta(days=monthrange(year, month)[1])
+    return (
+        _format_minutes(datetime.combine(start, time())),
+        _format_minutes(datetime.combine(end, time())),
+    )
+
+
+def _row_to_entry(row: sqlite3.Row) -> Entry:
+    return Entry.from_dict({"id": row["id"], "start": row["start"], "end": row["end"]})
+
+
+class _SqliteDatabase:
+    """Connection wrapper shared by the entry and absence storages."""
+
+    def __init__(self, path: Path, fsync_policy: FsyncPolicy = FsyncPolicy.BATCH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Flet runs handlers on worker threads, so access is serialized here
+        # instead of relying on sqlite's per-thread connection check.
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={_SYNCHRONOUS_BY_POLICY[FsyncPolicy(fsync_policy)]}")
+        self.connection.executescript(_SCHEMA)
+
+    def query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        with self.lock:
+            return self.connection.execute(sql, tuple(params)).fetchall()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.lock, self.connection as connection:
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+class SqliteEntryStorage:
+    """
+    Entry storage backed by a single SQLite database in WAL mode.
+
+    Exposes the same persistence interface as :class:`EntryStorage` plus
+    indexed range queries, so it can also act as an ``EntryRetriever``.
+    """
+
+    month_key_from_date = staticmethod(EntryStorage.month_key_from_date)
+    year_month_from_key = staticmethod(EntryStorage.year_month_from_key)
+
+    def __init__(self, database: _SqliteDatabase) -> None:
+        self.database = database
+
+    # ------------------------------------------------------------------
+    # Persistence interface
+    def load_month(self, key: str) -> List[Entry]:
+        lower, upper = _month_bounds(key)
+        return self.entries_between(lower, upper)
+
+    def save_month(self, key: str, entries: List[Entry]) -> None:
+        lower, upper = _month_bounds(key)
+        with self.database.lock, self.database.connection as connection:
+            connection.execute("DELETE FROM entries WHERE start >= ? AND start < ?", (lower, upper))
+            connection.executemany(
+                'INSERT OR REPLACE INTO entries (id, start, "end") VALUES (:id, :start, :end)',
+                [entry.to_dict() for entry in entries],
+            )
+
+    def save_entry(self, key: str, entries: List[Entry], entry: Entry) -> None:
+        with self.database.lock, self.database.connection as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (id, start, "end") VALUES (:id, :start, :end)',
+                entry.to_dict(),
+            )
+
+    def remove_entry(self, key: str, entries: List[Entry], entry_id: str) -> None:
+        with self.database.lock, self.database.connection as connection:
+            connection.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def load_all(self) -> Dict[str, List[Entry]]:
+        result: Dict[str, List[Entry]] = {}
+        for row in self.database.query('SELECT id, start, "end" FROM entries ORDER BY start'):
+            result.setdefault(row["start"][:7], []).append(_row_to_entry(row))
+        return result
+
+    def load_months(self, keys: Iterable[str]) -> Dict[str, List[Entry]]:
+        # Indexed range reads are cheap; a pool would only contend on the lock.
+        return {key: self.load_month(key) for key in keys}
+
+    def month_keys(self) -> List[str]:
+        rows = self.database.query("SELECT DISTINCT substr(start, 1, 7) AS key FROM entries ORDER BY key")
+        return [row["key"] for row in rows]
+
+    def read_open_hint(self) -> Optional[List[str]]:
+        # The partial index on open entries makes this cheap, so no hint is stored.
+        return sorted({entry.start.strftime("%Y-%m") for entry in self.open_entries()})
+
+    def write_open_hint(self, month_keys: List[str]) -> None:
+        return None
+
+    def sync(self) -> None:
+        # Durability is handled by SQLite according to PRAGMA synchronous.
+        return None
+
+    def close(self) -> None:
+        self.database.close()
+
+    # ------------------------------------------------------------------
+    # Range queries
+    def entries_between(self, lower: datetime | str, upper: datetime | str) -> List[Entry]:
+        """Return entries starting in ``[lower, upper)`` ordered by start."""
+        if isinstance(lower, datetime):
+            lower = _format_minutes(lower)
+        if isinstance(upper, datetime):
+            upper = _format_minutes(upper)
+        rows = self.database.query(
+            'SELECT id, start, "end" FROM entries WHERE start >= ? AND start < ? ORDER BY start',
+            (lower, upper),
+        )
+        return [_row_to_entry(row) for row in rows]
+
+    def entries_for_day(self, target: date) -> List[Entry]:
+        lower = datetime.combine(target, time())
+        return self.entries_between(lower, lower + timedelta(days=1))
+
+    def entries_for_month(self, year: int, month: int) -> List[Entry]:
+        return self.load_month(f"{year:04d}-{month:02d}")
+
+    def find_entry(self, entry_id: str) -> Optional[Entry]:
+        rows = self.database.query('SELECT id, start, "end" FROM entries WHERE id = ?', (entry_id,))
+        return _row_to_entry(rows[0]) if rows else None
+
+    def open_entries(self) -> List[Entry]:
+        rows = self.database.query('SELECT id, start, "end" FROM entries WHERE "end" IS NULL ORDER BY start')
+        return [_row_to_entry(row) for row in rows]
+
+
+class SqliteAbsenceStorage:
+    """Absence storage backed by the same SQLite database as the entries."""
+
+    def __init__(self, database: _SqliteDatabase) -> None:
+        self.database = database
+
+    def load_year(self, year: int) -> List[AbsenceRule]:
+        rows = self.database.query(
+            'SELECT start, "end", reason, hours FROM absences WHERE start >= ? AND start < ? '
+            "ORDER BY start",
+            (f"{year:04d}-01-01", f"{year + 1:04d}-01-01"),
+        )
+        return [_from_payload(dict(row)) for row in rows]
+
+    def load_all(self) -> List[AbsenceRule]:
+        rows = self.database.query('SELECT start, "end", reason, hours FROM absences')
+        rules = [_from_payload(dict(row)) for row in rows]
+        rules.sort(key=lambda r: (r.start, r.end or r.start, r.reason))
+        return rules
+
+    def save_rules(self, rules: Iterable[AbsenceRule]) -> None:
+        payload = [_to_payload(rule) for rule in rules]
+        with self.database.lock, self.database.connection as connection:
+            connection.execute("DELETE FROM absences")
+            connection.executemany(
+                'INSERT INTO absences (start, "end", reason, hours) VALUES (:start, :end, :reason, :hours)',
+                payload,
+            )
+
+    def save_years(self, rules: Iterable[AbsenceRule], years: Iterable[int]) -> None:
+        years = set(years)
+        payload = [_to_payload(rule) for rule in rules if rule.start.year in years]
+        with self.database.lock, self.database.connection as connection:
+            connection.executemany(
+                "DELETE FROM absences WHERE start >= ? AND start < ?",
+                [(f"{year:04d}-01-01", f"{year + 1:04d}-01-01") for year in sorted(years)],
+            )
+            connection.executemany(
+                'INSERT INTO absences (start, "end", reason, hours) VALUES (:start, :end, :reason, :hours)',
+                payload,
+            )
+
+    def sync(self) -> None:
+        # Durability is handled by SQLite according to PRAGMA synchronous.
+        return None
+
+    def close(self) -> None:
+        self.database.close()
+
+
+def open_sqlite_storages(
+    data_dir: Path,
+    fsync_policy: FsyncPolicy = FsyncPolicy.BATCH,
+) -> tuple[SqliteEntryStorage, SqliteAbsenceStorage]:
+    database = _SqliteDatabase(Path(data_dir) / DATABASE_NAME, fsync_policy)
+    return SqliteEntryStorage(database), SqliteAbsenceStorage(database)
+
+
+def migrate_json_to_sqlite(
+    data_dir: Path,
+    entry_storage: SqliteEntryStorage,
+    absence_storage: SqliteAbsenceStorage,
+) -> tuple[int, int]:
+    """
+    Copy the JSON ``entries/`` and ``absences/`` trees into the database.
+
+    The migration is recorded in the database, so it only ever runs once.
+    The JSON files are left untouched.
+    """
+    database = entry_storage.database
+    if database.get_meta(_MIGRATED_KEY):
+        return 0, 0
+    data_dir = Path(data_dir)
+    migrated_entries = 0
+    migrated_absences = 0
+    entries_dir = data_dir / "entries"
+    if entries_dir.exists():
+        for key, entries in EntryStorage(base_dir=entries_dir).load_all().items():
+            entry_storage.save_month(key, entries)
+            migrated_entries += len(entries)
+    absences_dir = data_dir / "absences"
+    if absences_dir.exists():
+        rules = AbsenceStorage(base_dir=absences_dir).load_all()
+        absence_storage.save_rules(rules)
+        migrated_absences = len(rules)
+    database.set_meta(_MIGRATED_KEY, datetime.now().isoformat(timespec="seconds"))
+    return migrated_entries, migrated_absences
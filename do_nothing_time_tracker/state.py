@@ -1,117 +1,779 @@
 from __future__ import annotations
 
+from .events import ChangeBus
+from .events import EntriesChanged
+from .history import EditHistory
+from .history import EntryEdit
+from .locks import ReadWriteLock
 from .models import Entry
+from .models import OverlapPolicy
 from .storage import EntryStorage
+from .storage import EntryStore
+from bisect import bisect_right
+from calendar import monthrange
+from contextlib import contextmanager
 from datetime import date
 from datetime import datetime
 from datetime import time
+from datetime import timedelta
+from time import monotonic
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import atexit
+import threading
+
+
+class EntryBatch:
+    """
+    Entry changes staged for :meth:`TrackerState.apply_batch`.
+
+    Later operations on the same id replace earlier ones, so saving and
+    then deleting an entry only deletes it.
+    """
+
+    def __init__(self) -> None:
+        self._operations: Dict[str, Optional[Entry]] = {}
+
+    def save(self, entry: Entry) -> None:
+        self._operations[entry.id] = entry
+
+    def delete(self, entry_id: str) -> None:
+        self._operations[entry_id] = None
+
+    @property
+    def saves(self) -> List[Entry]:
+        return [entry for entry in self._operations.values() if entry is not None]
+
+    @property
+    def deletes(self) -> List[str]:
+        return [entry_id for entry_id, entry in self._operations.items() if entry is None]
+
+    def __len__(self) -> int:
+        return len(self._operations)
 
 
 class TrackerState:
-    def __init__(self, storage: EntryStorage) -> None:
+    """
+    In-memory view over the stored entries.
+
+    In ``lazy`` mode months are only read from storage when a query or
+    mutation touches them. The months holding an open entry are kept as a
+    persisted hint, so ``open_entry`` and the overnight-close pass do not
+    need the whole history.
+
+    With a positive ``flush_delay`` mutations only mark their month dirty;
+    dirty months are written once ``flush_delay`` seconds pass without
+    further edits, but never later than ``max_unflushed`` seconds after the
+    first pending change, and always on ``flush``/``close`` and at exit.
+
+    At most one entry is open at a time; it is kept as a pointer that every
+    mutation updates, so ``open_entry`` never scans the history. Loaded
+    entries are also indexed by id, so lookups and removals only touch the
+    month that owns the entry, and by day as start-sorted tuples that
+    ``entries_for_day`` returns without filtering or sorting.
+
+    Saves are checked against the day buckets for overlapping entries and
+    handled according to ``overlap_policy``: rejected with ``ValueError``,
+    trimmed to the free time around the existing entries, or merged with
+    them into one entry. A running entry lasts until the next entry of its
+    day starts (or the day ends), so it never overlaps later entries.
+
+    Every mutation publishes an :class:`EntriesChanged` event on ``events``
+    with the affected ids and the dates they covered before and after, and
+    records the touched entries as an :class:`EntryEdit`, so it can be
+    undone and redone without reloading from disk. Edits go to the
+    ``history`` passed to the mutation (one per UI session, so sessions
+    sharing the state only undo their own edits), or to the state's own
+    ``history`` otherwise.
+
+    Entries left running from an earlier day are closed at 23:59 on
+    construction (unless ``close_overnight`` is false) and by
+    :meth:`close_overnight_entries`.
+
+    Queries share a read lock and mutations (including the flush timer) take
+    the write lock, so Flet handlers and the ticker can run concurrently.
+    Lazy month loads triggered by concurrent readers are serialized
+    separately.
+    """
+
+    def __init__(
+        self,
+        storage: EntryStore,
+        *,
+        lazy: bool = False,
+        flush_delay: float = 0.0,
+        max_unflushed: float = 5.0,
+        overlap_policy: OverlapPolicy = OverlapPolicy.REJECT,
+        events: Optional[ChangeBus] = None,
+        history: Optional[EditHistory] = None,
+        close_overnight: bool = True,
+    ) -> None:
         self.storage = storage
-        self.entries_by_month: Dict[str, List[Entry]] = storage.load_all()
-        self._close_overnight_entries()
+        self.events = events or ChangeBus()
+        self.history = history or EditHistory()
+        self.history.register(EntryEdit, self.apply_edit)
+        self._changes: List[Entry] = []
+        # id -> entry before the running mutation (None: did not exist)
+        self._touched: Dict[str, Optional[Entry]] = {}
+        self.overlap_policy = OverlapPolicy(overlap_policy)
+        self.lazy = lazy
+        self.flush_delay = flush_delay
+        self.max_unflushed = max(max_unflushed, flush_delay)
+        self._lock = ReadWriteLock()
+        self._load_lock = threading.RLock()
+        self._dirty_months: Set[str] = set()
+        self._hint_dirty = False
+        self._dirty_since: Optional[float] = None
+        self._flush_timer: Optional[threading.Timer] = None
+        if self._coalescing:
+            atexit.register(self.flush)
+        self.entries_by_month: Dict[str, List[Entry]] = {} if lazy else storage.load_all()
+        self._positions: Dict[str, tuple[str, int]] = {}
+        self._days: Dict[date, Tuple[Entry, ...]] = {}
+        for key in self.entries_by_month:
+            self._index_month(key)
+            self._index_days(key)
+        self._fully_loaded = not lazy
+        self._open_months: Set[str] = self._initial_open_months()
+        self._open_entry: Optional[Entry] = self._find_open_entry()
+        if close_overnight:
+            self.close_overnight_entries()
 
     # ------------------------------------------------------------------
     # Entry queries
     def open_entry(self) -> Optional[Entry]:
-        for entries in self.entries_by_month.values():
-            for entry in entries:
-                if entry.is_open:
-                    return entry
-        return None
+        return self._open_entry
 
-    def entries_for_day(self, target: date) -> List[Entry]:
-        key = EntryStorage.month_key_from_date(target)
-        entries = [entry for entry in self.entries_by_month.get(key, []) if entry.start.date() == target]
-        return sorted(entries, key=lambda entry: entry.start)
+    def entries_for_day(self, target: date) -> Tuple[Entry, ...]:
+        with self._lock.read():
+            self._month(EntryStorage.month_key_from_date(target))
+            return self._days.get(target, ())
 
     def entries_for_month(self, year: int, month: int) -> List[Entry]:
         key = f"{year:04d}-{month:02d}"
-        return list(self.entries_by_month.get(key, []))
+        with self._lock.read():
+            return list(self._month(key))
+
+    def all_entries(self) -> List[Entry]:
+        """Every stored entry, month by month; a lazy state loads the remaining months first."""
+        with self._lock.read():
+            self._load_all_months()
+            with self._load_lock:
+                buckets = [self.entries_by_month[key] for key in sorted(self.entries_by_month)]
+            return [entry for bucket in buckets for entry in bucket]
 
     def find_entry(self, entry_id: str) -> Optional[Entry]:
-        for entries in self.entries_by_month.values():
-            for entry in entries:
-                if entry.id == entry_id:
-                    return entry
-        return None
+        with self._lock.read():
+            location = self._locate(entry_id)
+            if location is None:
+                return None
+            key, idx = location
+            return self.entries_by_month[key][idx]
+
+    def find_overlaps(self, start: date, end: date) -> List[Tuple[Entry, Entry]]:
+        """Return every pair of overlapping entries starting between ``start`` and ``end`` inclusive."""
+        with self._lock.read():
+            for key in self._month_keys_between(start, end):
+                self._month(key)
+            with self._load_lock:
+                days = sorted(day for day in self._days if start <= day <= end)
+            pairs: List[Tuple[Entry, Entry]] = []
+            active: List[Entry] = []
+            for day in days:
+                for entry in self._days[day]:
+                    active = [other for other in active if self._runs_past(other, entry.start)]
+                    pairs.extend((other, entry) for other in active)
+                    active.append(entry)
+        return pairs
 
     # ------------------------------------------------------------------
     # Mutations
-    def clock_in(self, timestamp: Optional[datetime] = None) -> Entry:
+    def close_overnight_entries(self) -> bool:
+        """Close entries left running from an earlier day at 23:59; returns whether any were closed."""
+        with self._lock.write():
+            closed = self._close_overnight_entries()
+            self._touched.clear()
+        self._publish_changes()
+        return closed
+
+    def clock_in(
+        self,
+        timestamp: Optional[datetime] = None,
+        *,
+        history: Optional[EditHistory] = None,
+    ) -> Entry:
         now = timestamp or datetime.now()
-        if self.open_entry() is not None:
-            raise ValueError("Cannot clock in while another entry is open.")
-        entry = Entry.new(start=now)
-        self._add_entry(entry)
+        with self._lock.write():
+            if self.open_entry() is not None:
+                raise ValueError("Cannot clock in while another entry is open.")
+            entry, merged = self._resolve_overlaps(Entry.new(start=now))
+            self._remove_merged(merged)
+            self._add_entry(entry)
+            self._record_edit(history)
+        self._publish_changes()
         return entry
 
-    def clock_out(self, timestamp: Optional[datetime] = None) -> Entry:
-        open_entry = self.open_entry()
-        if open_entry is None:
-            raise ValueError("No open entry to close.")
-        end_time = timestamp or datetime.now()
-        updated = open_entry.with_updates(end=end_time)
-        self._replace_entry(updated)
+    def clock_out(
+        self,
+        timestamp: Optional[datetime] = None,
+        *,
+        history: Optional[EditHistory] = None,
+    ) -> Entry:
+        """Close the running entry; it never ends past the start of a later entry of its day."""
+        with self._lock.write():
+            open_entry = self.open_entry()
+            if open_entry is None:
+                raise ValueError("No open entry to close.")
+            end_time = timestamp or datetime.now()
+            next_start = self._next_start(open_entry, {open_entry.id})
+            if next_start is not None:
+                end_time = min(end_time, next_start)
+            updated, merged = self._resolve_overlaps(open_entry.with_updates(end=end_time))
+            self._remove_merged(merged)
+            self._replace_entry(updated)
+            self._record_edit(history)
+        self._publish_changes()
         return updated
 
-    def save_entry(self, entry: Entry) -> None:
-        self._replace_entry(entry)
+    def save_entry(self, entry: Entry, *, history: Optional[EditHistory] = None) -> Entry:
+        """Add or update ``entry``; returns it as stored (trimmed or merged per ``overlap_policy``)."""
+        with self._lock.write():
+            if entry.is_open and self._open_entry is not None and self._open_entry.id != entry.id:
+                raise ValueError("Cannot open an entry while another entry is open.")
+            entry, merged = self._resolve_overlaps(entry)
+            self._remove_merged(merged)
+            self._replace_entry(entry)
+            self._record_edit(history)
+        self._publish_changes()
+        return entry
+
+    def delete_entry(self, entry_id: str, *, history: Optional[EditHistory] = None) -> bool:
+        with self._lock.write():
+            key = self._remove_from_month(entry_id)
+            if key is None:
+                return False
+            self._write_removal(key, entry_id)
+            self._track_open_month(key)
+            self._record_edit(history)
+        self._publish_changes()
+        return True
+
+    def apply_batch(
+        self,
+        saves: Iterable[Entry] = (),
+        deletes: Iterable[str] = (),
+        *,
+        history: Optional[EditHistory] = None,
+    ) -> List[str]:
+        """
+        Add/update ``saves`` and remove ``deletes`` in one step.
+
+        The whole batch is validated before anything changes, each touched
+        month is re-sorted and persisted once, and the touched month keys
+        are returned. Unknown ids in ``deletes`` are ignored.
+        """
+        saves = list(saves)
+        deletes = list(deletes)
+        with self._lock.write():
+            self._validate_batch(saves, deletes)
+            saves, merged = self._resolve_batch_overlaps(saves, deletes)
+            touched = self._apply(saves, [*deletes, *merged])
+            self._record_edit(history)
+        self._publish_changes()
+        return touched
 
-    def delete_entry(self, entry_id: str) -> bool:
-        removed = False
-        for key, entries in list(self.entries_by_month.items()):
-            new_entries = [entry for entry in entries if entry.id != entry_id]
-            if len(new_entries) != len(entries):
-                self._persist_month(key, new_entries)
-                removed = True
-        return removed
+    @contextmanager
+    def batch(self, *, history: Optional[EditHistory] = None) -> Iterator[EntryBatch]:
+        """Stage changes on the yielded :class:`EntryBatch`; they are applied on a clean exit."""
+        staged = EntryBatch()
+        yield staged
+        self.apply_batch(staged.saves, staged.deletes, history=history)
+
+    def flush(self) -> None:
+        """Write every dirty month now; a no-op when nothing is pending."""
+        with self._lock.write():
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            for key in sorted(self._dirty_months):
+                self.storage.save_month(key, self.entries_by_month.get(key, []))
+            self._dirty_months.clear()
+            # The hint goes last so it never points away from unwritten data.
+            if self._hint_dirty:
+                self.storage.write_open_hint(sorted(self._open_months))
+                self._hint_dirty = False
+            self._dirty_since = None
+            self.storage.sync()
+
+    def undo(self) -> bool:
+        """Revert the newest edit on ``history``; returns whether there was one."""
+        return self.history.undo() is not None
+
+    def redo(self) -> bool:
+        """Re-apply the newest undone edit on ``history``; returns whether there was one."""
+        return self.history.redo() is not None
+
+    @property
+    def has_pending_writes(self) -> bool:
+        return bool(self._dirty_months or self._hint_dirty)
+
+    def close(self) -> None:
+        """Flush pending writes and release storage resources."""
+        with self._lock.write():
+            self.flush()
+            if self._coalescing:
+                atexit.unregister(self.flush)
+            self.storage.close()
 
     # ------------------------------------------------------------------
     # Internal helpers
+    def _month(self, key: str) -> List[Entry]:
+        bucket = self.entries_by_month.get(key)
+        if bucket is not None:
+            return bucket
+        if self._fully_loaded:
+            return []
+        with self._load_lock:
+            if key not in self.entries_by_month:
+                self._register_month(key, self.storage.load_month(key))
+            return self.entries_by_month[key]
+
+    def _load_all_months(self) -> None:
+        with self._load_lock:
+            if self._fully_loaded:
+                return
+            missing = [key for key in self.storage.month_keys() if key not in self.entries_by_month]
+            for key, bucket in self.storage.load_months(missing).items():
+                self._register_month(key, bucket)
+            self._fully_loaded = True
+
+    def _register_month(self, key: str, bucket: List[Entry]) -> None:
+        # Indexed before it becomes visible, so unlocked fast-path readers
+        # in ``_month`` never see a month without its index entries.
+        self._index_month(key, bucket=bucket)
+        self._index_days(key, bucket)
+        self.entries_by_month[key] = bucket
+
+    def _locate(self, entry_id: str, *, load_all: bool = True) -> Optional[tuple[str, int]]:
+        """
+        Month key and index of ``entry_id``.
+
+        ``load_all=False`` only looks at the loaded months; saves use it
+        since an entry being edited was read from a loaded month, so an id
+        missing from them is new and not worth loading every month for.
+        """
+        location = self._positions.get(entry_id)
+        if location is None and load_all and not self._fully_loaded:
+            self._load_all_months()
+            location = self._positions.get(entry_id)
+        return location
+
+    def _index_month(self, key: str, first: int = 0, bucket: Optional[List[Entry]] = None) -> None:
+        """(Re)index the positions of ``key`` from ``first`` onwards."""
+        bucket = self.entries_by_month[key] if bucket is None else bucket
+        for idx in range(first, len(bucket)):
+            self._positions[bucket[idx].id] = (key, idx)
+
+    def _index_days(self, key: str, bucket: Optional[List[Entry]] = None) -> None:
+        """Rebuild the day buckets of month ``key`` from scratch."""
+        bucket = self.entries_by_month[key] if bucket is None else bucket
+        year, month = EntryStorage.year_month_from_key(key)
+        for day in range(1, monthrange(year, month)[1] + 1):
+            self._days.pop(date(year, month, day), None)
+        grouped: Dict[date, List[Entry]] = {}
+        for entry in bucket:
+            grouped.setdefault(entry.start.date(), []).append(entry)
+        for day, entries in grouped.items():
+            self._days[day] = tuple(sorted(entries, key=lambda entry: entry.start_minutes))
+
+    def _add_to_day(self, entry: Entry) -> None:
+        day = entry.start.date()
+        entries = self._days.get(day, ())
+        idx = bisect_right(entries, entry.start_minutes, key=lambda existing: existing.start_minutes)
+        self._days[day] = entries[:idx] + (entry,) + entries[idx:]
+
+    def _remove_from_day(self, entry: Entry) -> None:
+        day = entry.start.date()
+        remaining = tuple(existing for existing in self._days.get(day, ()) if existing.id != entry.id)
+        if remaining:
+            self._days[day] = remaining
+        else:
+            self._days.pop(day, None)
+
+    def _initial_open_months(self) -> Set[str]:
+        if not self._fully_loaded:
+            hint = self.storage.read_open_hint()
+            if hint is not None:
+                return set(hint)
+            # No hint yet (first lazy start): pay for one full load to build it.
+            self._load_all_months()
+        open_months = {
+            key for key, entries in self.entries_by_month.items() if any(entry.is_open for entry in entries)
+        }
+        if self.storage.read_open_hint() != sorted(open_months):
+            self.storage.write_open_hint(sorted(open_months))
+        return open_months
+
+    def _apply(self, saves: List[Entry], deletes: List[str]) -> List[str]:
+        """Remove ``deletes``, upsert ``saves`` and persist each touched month once."""
+        touched: Set[str] = set()
+        for entry_id in deletes:
+            key = self._remove_from_month(entry_id)
+            if key is not None:
+                touched.add(key)
+        for entry in saves:
+            self._month(EntryStorage.month_key_from_date(entry.start.date()))
+            key = self._remove_from_month(entry.id, load_all=False)
+            if key is not None:
+                touched.add(key)
+        for entry in saves:
+            key = EntryStorage.month_key_from_date(entry.start.date())
+            # a fully loaded state hands out a detached list for months it does not hold yet
+            self.entries_by_month.setdefault(key, self._month(key)).append(entry)
+            self._add_to_day(entry)
+            self._changes.append(entry)
+            self._touched.setdefault(entry.id, None)
+            if entry.is_open:
+                self._open_entry = entry
+            touched.add(key)
+        for key in sorted(touched):
+            self._store_month(key, self.entries_by_month[key])
+            self._write_month(key)
+            self._track_open_month(key)
+        return sorted(touched)
+
+    def _record_edit(self, history: Optional[EditHistory] = None) -> None:
+        touched, self._touched = self._touched, {}
+        changes = []
+        for entry_id, before in touched.items():
+            location = self._positions.get(entry_id)
+            after = self.entries_by_month[location[0]][location[1]] if location else None
+            if before != after:
+                changes.append((before, after))
+        if changes:
+            (history or self.history).record(EntryEdit(tuple(changes)))
+
+    def apply_edit(self, edit: EntryEdit) -> None:
+        """
+        Move the entries of ``edit`` from their ``before`` to their ``after`` state.
+
+        This is the :class:`EditHistory` handler for entry edits. It refuses
+        to apply when the entries changed since, or when the restored
+        entries would overlap entries added since: trimming or merging them
+        here would leave a state the edit can no longer be reversed from.
+        """
+        with self._lock.write():
+            for before, after in edit.changes:
+                entry_id = (before or after).id
+                if self.find_entry(entry_id) != before:
+                    raise ValueError("The entries were changed since this edit; it can no longer be undone.")
+            saves = [after for _, after in edit.changes if after is not None]
+            deletes = [before.id for before, after in edit.changes if after is None and before is not None]
+            self._validate_batch(saves, deletes)
+            if self.overlap_policy != OverlapPolicy.ALLOW:
+                edited = {(before or after).id for before, after in edit.changes}
+                for entry in saves:
+                    if self._overlapping(entry.start, self._span_end(entry, edited), edited):
+                        raise ValueError("This edit would overlap newer entries; it can no longer be undone.")
+            self._apply(saves, deletes)
+            self._touched.clear()
+        self._publish_changes()
+
+    def _validate_batch(self, saves: List[Entry], deletes: List[str]) -> None:
+        save_ids = {entry.id for entry in saves}
+        deleted = set(deletes)
+        if len(save_ids) != len(saves) or not save_ids.isdisjoint(deleted):
+            raise ValueError("A batch may only change each entry once.")
+        for entry in saves:
+            if entry.end is not None and entry.end < entry.start:
+                raise ValueError(f"Entry {entry.id} ends before it starts.")
+        open_ids = {entry.id for entry in saves if entry.is_open}
+        current = self._open_entry
+        if current is not None and current.id not in save_ids | deleted:
+            open_ids.add(current.id)
+        if len(open_ids) > 1:
+            raise ValueError("A batch cannot leave more than one entry open.")
+
+    def _publish_changes(self) -> None:
+        with self._lock.write():
+            changes, self._changes = self._changes, []
+        if not changes:
+            return
+        days = [entry.start.date() for entry in changes]
+        days.extend(entry.end.date() for entry in changes if entry.end is not None)
+        entry_ids = tuple(dict.fromkeys(entry.id for entry in changes))
+        self.events.publish(EntriesChanged(entry_ids=entry_ids, first_day=min(days), last_day=max(days)))
+
+    # ------------------------------------------------------------------
+    # Overlaps
+    @staticmethod
+    def _effective_end(entry: Entry) -> datetime:
+        return entry.end or datetime.combine(entry.start.date(), time.max)
+
+    @staticmethod
+    def _runs_past(entry: Entry, moment: datetime) -> bool:
+        """Whether ``entry`` still occupies ``moment``; a running one only its own start."""
+        if entry.end is None:
+            return entry.start == moment
+        return entry.end > moment
+
+    def _span_end(self, entry: Entry, exclude: Set[str]) -> datetime:
+        """End of ``entry`` for overlap checks; a running entry ends where the next one of its day starts."""
+        if entry.end is not None:
+            return entry.end
+        return self._next_start(entry, exclude) or self._effective_end(entry)
+
+    def _next_start(self, entry: Entry, exclude: Set[str]) -> Optional[datetime]:
+        """Start of the first entry after ``entry`` on its day, ignoring ``exclude``."""
+        bucket = self.entries_for_day(entry.start.date())
+        for other in bucket[bisect_right(bucket, entry.start, key=lambda other: other.start) :]:
+            if other.id not in exclude and other.id != entry.id:
+                return other.start
+        return None
+
+    @staticmethod
+    def _month_keys_between(start: date, end: date) -> List[str]:
+        keys = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            keys.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return keys
+
+    def _overlapping(self, start: datetime, end: datetime, exclude: Set[str]) -> List[Entry]:
+        """Entries intersecting ``[start, end)``, found by bisecting the day buckets."""
+        found: List[Entry] = []
+        # an entry from the previous day may still run past midnight
+        day = start.date() - timedelta(days=1)
+        while day <= end.date():
+            bucket = self.entries_for_day(day)
+            limit = bisect_right(bucket, end, key=lambda entry: entry.start)
+            for entry in bucket[:limit]:
+                if entry.id in exclude or entry.start == end:
+                    continue
+                if entry.end is None:
+                    # a running entry is cut short by whatever starts after it
+                    if entry.start >= start:
+                        found.append(entry)
+                elif entry.end > start:
+                    found.append(entry)
+            day += timedelta(days=1)
+        return found
+
+    def _resolve_overlaps(self, entry: Entry, exclude: Optional[Set[str]] = None) -> tuple[Entry, List[str]]:
+        """Apply ``overlap_policy`` to ``entry``; returns the entry to store and the ids merged into it."""
+        if self.overlap_policy == OverlapPolicy.ALLOW:
+            return entry, []
+        if exclude is None or entry.id not in exclude:
+            exclude = (exclude or set()) | {entry.id}
+        end = self._span_end(entry, exclude)
+        overlaps = self._overlapping(entry.start, end, exclude)
+        if not overlaps:
+            return entry, []
+        if self.overlap_policy == OverlapPolicy.TRIM:
+            return self._trimmed(entry, end, overlaps), []
+        if self.overlap_policy == OverlapPolicy.MERGE:
+            return self._merged(entry, overlaps, exclude)
+        times = ", ".join(
+            f"{other.start:%H:%M}-{other.end:%H:%M}" if other.end else f"{other.start:%H:%M}-running"
+            for other in overlaps
+        )
+        raise ValueError(f"Entry overlaps existing entries ({times}).")
+
+    def _trimmed(self, entry: Entry, end: datetime, overlaps: List[Entry]) -> Entry:
+        start = entry.start
+        for other in sorted(overlaps, key=lambda other: other.start):
+            other_end = self._effective_end(other)
+            if other.start <= start < other_end:
+                start = other_end
+            elif entry.end is not None and start < other.start < end <= other_end:
+                end = other.start
+            elif other_end <= start or other.start >= end:
+                continue
+            else:
+                raise ValueError("Entry cannot be trimmed: it fully contains another entry.")
+        if start >= end:
+            raise ValueError("Entry cannot be trimmed: it lies entirely within other entries.")
+        return Entry(id=entry.id, start=start, end=end if entry.end is not None else None)
+
+    def _merged(self, entry: Entry, overlaps: List[Entry], exclude: Set[str]) -> tuple[Entry, List[str]]:
+        merged_ids: List[str] = []
+        while overlaps:
+            group = [entry, *overlaps]
+            is_open = any(item.is_open for item in group)
+            entry = Entry(
+                id=entry.id,
+                start=min(item.start for item in group),
+                end=None if is_open else max(self._effective_end(item) for item in group),
+            )
+            merged_ids.extend(other.id for other in overlaps)
+            exclude = exclude | {other.id for other in overlaps}
+            overlaps = self._overlapping(entry.start, self._span_end(entry, exclude), exclude)
+        return entry, merged_ids
+
+    def _resolve_batch_overlaps(
+        self, saves: List[Entry], deletes: List[str]
+    ) -> tuple[List[Entry], List[str]]:
+        if self.overlap_policy == OverlapPolicy.ALLOW:
+            return saves, []
+        ordered = sorted(saves, key=lambda entry: entry.start)
+        for previous, current in zip(ordered, ordered[1:]):
+            if self._runs_past(previous, current.start):
+                raise ValueError(f"Entries {previous.id} and {current.id} in the batch overlap.")
+        # shared by every entry, not copied per entry: large batches stay linear
+        changed = {entry.id for entry in saves} | set(deletes)
+        resolved: List[Entry] = []
+        merged: List[str] = []
+        for entry in saves:
+            entry, merged_ids = self._resolve_overlaps(entry, changed)
+            resolved.append(entry)
+            merged.extend(merged_ids)
+            changed.update(merged_ids)
+        return resolved, merged
+
+    def _remove_merged(self, entry_ids: List[str]) -> None:
+        for entry_id in entry_ids:
+            key = self._remove_from_month(entry_id)
+            if key is not None:
+                self._write_removal(key, entry_id)
+                self._track_open_month(key)
+
+    def _find_open_entry(self) -> Optional[Entry]:
+        for key in sorted(self._open_months):
+            for entry in self._month(key):
+                if entry.is_open:
+                    return entry
+        return None
+
+    def _track_open_month(self, key: str) -> None:
+        has_open = any(entry.is_open for entry in self.entries_by_month.get(key, []))
+        if has_open == (key in self._open_months):
+            return
+        if has_open:
+            self._open_months.add(key)
+        else:
+            self._open_months.discard(key)
+        if self._coalescing:
+            self._hint_dirty = True
+            self._schedule_flush()
+        else:
+            self.storage.write_open_hint(sorted(self._open_months))
+
+    # ------------------------------------------------------------------
+    # Persistence (immediate, or coalesced per month when flush_delay > 0)
+    @property
+    def _coalescing(self) -> bool:
+        return self.flush_delay > 0
+
+    def _write_entry(self, key: str, entry: Entry) -> None:
+        if self._coalescing:
+            self._mark_dirty(key)
+        else:
+            self.storage.save_entry(key, self.entries_by_month[key], entry)
+
+    def _write_removal(self, key: str, entry_id: str) -> None:
+        if self._coalescing:
+            self._mark_dirty(key)
+        else:
+            self.storage.remove_entry(key, self.entries_by_month[key], entry_id)
+
+    def _write_month(self, key: str) -> None:
+        if self._coalescing:
+            self._mark_dirty(key)
+        else:
+            self.storage.save_month(key, self.entries_by_month[key])
+
+    def _mark_dirty(self, key: str) -> None:
+        self._dirty_months.add(key)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        now = monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        deadline = self._dirty_since + self.max_unflushed
+        delay = max(min(self.flush_delay, deadline - now), 0.0)
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(delay, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
     def _add_entry(self, entry: Entry) -> None:
         key = EntryStorage.month_key_from_date(entry.start.date())
-        bucket = self.entries_by_month.setdefault(key, [])
+        bucket = self._month(key)
         bucket.append(entry)
-        self._persist_month(key, bucket)
+        self._add_to_day(entry)
+        self._changes.append(entry)
+        self._touched.setdefault(entry.id, None)
+        if entry.is_open:
+            self._open_entry = entry
+        self._store_month(key, bucket)
+        self._write_entry(key, entry)
+        self._track_open_month(key)
 
     def _replace_entry(self, entry: Entry) -> None:
-        # remove existing record (if any)
-        found = False
-        for key, bucket in list(self.entries_by_month.items()):
-            for idx, existing in enumerate(bucket):
-                if existing.id == entry.id:
-                    del bucket[idx]
-                    self._persist_month(key, bucket)
-                    found = True
-                    break
-            if found:
-                break
-        # add to appropriate month bucket
+        key = EntryStorage.month_key_from_date(entry.start.date())
+        self._month(key)
+        previous_key = self._remove_from_month(entry.id, load_all=False)
+        # moving to another month: the old month has to record the removal,
+        # otherwise the put below supersedes the previous record on its own
+        if previous_key is not None and previous_key != key:
+            self._write_removal(previous_key, entry.id)
+            self._track_open_month(previous_key)
         self._add_entry(entry)
 
+    def _remove_from_month(self, entry_id: str, *, load_all: bool = True) -> Optional[str]:
+        location = self._locate(entry_id, load_all=load_all)
+        if location is None:
+            return None
+        key, idx = location
+        self._remove_from_day(self.entries_by_month[key][idx])
+        self._changes.append(self.entries_by_month[key][idx])
+        self._touched.setdefault(entry_id, self.entries_by_month[key][idx])
+        del self.entries_by_month[key][idx]
+        del self._positions[entry_id]
+        self._index_month(key, idx)
+        if self._open_entry is not None and self._open_entry.id == entry_id:
+            self._open_entry = None
+        return key
+
     def _sorted_month(self, entries: List[Entry]) -> List[Entry]:
-        return sorted(entries, key=lambda entry: entry.start)
+        return sorted(entries, key=lambda entry: entry.start_minutes)
 
-    def _persist_month(self, key: str, entries: List[Entry]) -> None:
+    def _store_month(self, key: str, entries: List[Entry]) -> List[Entry]:
         sorted_entries = self._sorted_month(entries)
         self.entries_by_month[key] = sorted_entries
-        self.storage.save_month(key, sorted_entries)
+        self._index_month(key)
+        return sorted_entries
+
+    def _persist_month(self, key: str, entries: List[Entry]) -> None:
+        self._store_month(key, entries)
+        self._index_days(key)
+        self._write_month(key)
+        self._track_open_month(key)
 
-    def _close_overnight_entries(self) -> None:
+    def _close_overnight_entries(self) -> bool:
         today = date.today()
-        for key, entries in list(self.entries_by_month.items()):
+        closed_any = False
+        for key in sorted(self._open_months):
+            entries = self._month(key)
             updated = False
             for idx, entry in enumerate(entries):
                 if entry.is_open and entry.start.date() < today:
                     closing_point = datetime.combine(entry.start.date(), time(hour=23, minute=59))
                     entries[idx] = entry.with_updates(end=closing_point)
+                    self._changes.extend((entry, entries[idx]))
                     updated = True
             if updated:
-                self.entries_by_month[key] = self._sorted_month(entries)
-                self.storage.save_month(key, self.entries_by_month[key])
+                self._persist_month(key, entries)
+                closed_any = True
+        if closed_any:
+            self._open_entry = self._find_open_entry()
+        return closed_any
@@ -1,25 +1,449 @@
 from __future__ import annotations
 
+from .columnar import COLUMNAR_SUFFIX
+from .columnar import decode_columns
+from .columnar import encode_columns
+from .columnar import MonthColumns
+from .columnar import read_columns
 from .models import AbsenceRule
 from .models import Entry
+from .models import FsyncPolicy
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from dataclasses import field
 from datetime import date
+from datetime import datetime
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
+from time import monotonic
+from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Protocol
+from typing import Set
 
+import bz2
+import gzip
 import json
+import logging
+import lzma
+import os
+import pickle
+import threading
+
+try:  # pragma: no cover - optional speedup
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:  # pragma: no cover - optional speedup
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_bytes(path: Path, data: bytes, *, fsync: bool = False) -> None:
+    """
+    Replace ``path`` with ``data`` so readers see either the old or new file.
+
+    The content goes to a temporary sibling that is renamed over the target;
+    with ``fsync`` the data and the directory entry are flushed to disk first.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(data)
+        if fsync:
+            handle.flush()
+            os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    if fsync:
+        _fsync_directory(path.parent)
+
+
+def _fsync_directory(directory: Path) -> None:
+    if os.name == "nt":  # directories cannot be opened for fsync on Windows
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FileSyncer:
+    """
+    Applies an :class:`FsyncPolicy` to the files a storage writes.
+
+    ``ALWAYS`` flushes every write before returning, ``NEVER`` leaves it to
+    the OS, and ``BATCH`` remembers written files and flushes them together
+    at most ``interval`` seconds after the first of them was written (a
+    timer covers the last write of a burst), or on ``sync``.
+    """
+
+    def __init__(self, policy: FsyncPolicy = FsyncPolicy.NEVER, interval: float = 1.0) -> None:
+        self.policy = FsyncPolicy(policy)
+        self.interval = interval
+        self._pending: set[Path] = set()
+        self._last_sync = monotonic()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, data: bytes) -> None:
+        atomic_write_bytes(path, data, fsync=self.policy == FsyncPolicy.ALWAYS)
+        self._written(path)
+
+    def append(self, path: Path, data: bytes) -> None:
+        with path.open("ab") as handle:
+            handle.write(data)
+            if self.policy == FsyncPolicy.ALWAYS:
+                handle.flush()
+                os.fsync(handle.fileno())
+        self._written(path)
+
+    def _written(self, path: Path) -> None:
+        if self.policy != FsyncPolicy.BATCH:
+            return
+        with self._lock:
+            self._pending.add(path)
+            elapsed = monotonic() - self._last_sync
+            due = elapsed >= self.interval
+            if not due and self._timer is None:
+                self._timer = threading.Timer(self.interval - elapsed, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._last_sync = monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        directories = set()
+        for path in pending:
+            if not path.exists():
+                continue
+            with path.open("rb") as handle:
+                os.fsync(handle.fileno())
+            directories.add(path.parent)
+        for directory in directories:
+            _fsync_directory(directory)
+
+
+class JsonCodec:
+    """Standard library JSON codec; the base for the optional fast codecs."""
+
+    name = "json"
+
+    def dumps(self, payload: Any, *, indent: bool = True) -> bytes:
+        if indent:
+            return json.dumps(payload, indent=2).encode("utf-8")
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def dumps(self, payload: Any, *, indent: bool = True) -> bytes:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    name = "ujson"
+
+    def dumps(self, payload: Any, *, indent: bool = True) -> bytes:
+        return ujson.dumps(payload, indent=2 if indent else 0).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return ujson.loads(data)
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """
+    Return the JSON codec called ``name``.
+
+    ``auto`` picks the fastest installed library (orjson, then ujson) and
+    falls back to the standard library; unavailable names fall back too.
+    """
+    if name in ("auto", "orjson") and orjson is not None:
+        return OrjsonCodec()
+    if name in ("auto", "ujson") and ujson is not None:
+        return UjsonCodec()
+    return JsonCodec()
+
+
+_PRETTY_ENTRY = '  {\n    "id": %s,\n    "start": "%s",\n    "end": %s\n  }'
+_COMPACT_ENTRY = '{"id":%s,"start":"%s","end":%s}'
+
+
+def encode_month(entries: Iterable[Entry], *, indent: bool = True) -> bytes:
+    """
+    Encode a month of entries straight to JSON bytes.
+
+    Produces the same document as dumping ``[entry.to_dict() ...]`` with the
+    stdlib, without building an intermediate dict per entry.
+    """
+    template = _PRETTY_ENTRY if indent else _COMPACT_ENTRY
+    records = [
+        template
+        % (
+            encode_basestring_ascii(entry.id),
+            entry.start.isoformat(timespec="minutes"),
+            '"%s"' % entry.end.isoformat(timespec="minutes") if entry.end else "null",
+        )
+        for entry in entries
+    ]
+    if not records:
+        return b"[]"
+    if indent:
+        return ("[\n" + ",\n".join(records) + "\n]").encode("utf-8")
+    return ("[" + ",".join(records) + "]").encode("utf-8")
+
+
+def decode_month(data: bytes, codec: JsonCodec | None = None) -> List[Entry]:
+    """Decode a month file produced by :func:`encode_month` or ``Entry.to_dict``."""
+    payload = (codec or JsonCodec()).loads(data)
+    parse = datetime.fromisoformat
+    return [
+        Entry(
+            id=item["id"],
+            start=parse(item["start"]),
+            end=parse(item["end"]) if item.get("end") else None,
+        )
+        for item in payload
+    ]
+
+
+ARCHIVE_INDEX_NAME = "index.json"
+# compression name -> (file suffix, compress, decompress)
+ARCHIVE_FORMATS: Dict[str, tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "gzip": (".gz", gzip.compress, gzip.decompress),
+    "lzma": (".xz", lzma.compress, lzma.decompress),
+    "bz2": (".bz2", bz2.compress, bz2.decompress),
+}
+
+MONTH_FORMATS = ("json", "columnar")
+
+SNAPSHOT_CACHE_NAME = ".snapshot-cache.pickle"
+_SNAPSHOT_CACHE_VERSION = 2
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class SnapshotCache:
+    """
+    Pickled copy of parsed JSON files, validated per file by size and mtime.
+
+    Files whose signature still matches are served from the snapshot; the
+    rest are parsed again and the snapshot is refreshed on ``save``.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.stats = CacheStats()
+        self._files: Optional[Dict[str, tuple[tuple[int, int], list]]] = None
+        self._dirty = False
+        # Parallel loads consult the cache from several threads.
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _signature(source: Path) -> tuple[int, int]:
+        stat = source.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load(self) -> Dict[str, tuple[tuple[int, int], list]]:
+        with self._lock:
+            return self._load_locked()
+
+    def _load_locked(self) -> Dict[str, tuple[tuple[int, int], list]]:
+        if self._files is None:
+            self._files = {}
+            if self.path.exists():
+                try:
+                    with self.path.open("rb") as handle:
+                        payload = pickle.load(handle)
+                    if payload.get("version") == _SNAPSHOT_CACHE_VERSION:
+                        self._files = payload["files"]
+                except Exception:
+                    # A corrupt or incompatible snapshot is just a cold cache.
+                    self._files = {}
+        return self._files
+
+    def get(self, source: Path, loader: Callable[[Path], list]) -> list:
+        files = self._load()
+        signature = self._signature(source)
+        cached = files.get(source.name)
+        if cached is not None and cached[0] == signature:
+            with self._lock:
+                self.stats.hits += 1
+            return list(cached[1])
+        value = loader(source)
+        with self._lock:
+            self.stats.misses += 1
+            files[source.name] = (signature, list(value))
+            self._dirty = True
+        return value
+
+    def put(self, source: Path, value: list) -> None:
+        """Record freshly written content so the next start does not re-parse it."""
+        with self._lock:
+            self._load()[source.name] = (self._signature(source), list(value))
+            self._dirty = True
+
+    def retain(self, names: Iterable[str]) -> None:
+        files = self._load()
+        stale = files.keys() - set(names)
+        for name in stale:
+            del files[name]
+        self._dirty = self._dirty or bool(stale)
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        if not self._dirty:
+            return
+        payload: Dict[str, Any] = {"version": _SNAPSHOT_CACHE_VERSION, "files": self._files}
+        atomic_write_bytes(self.path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        self._dirty = False
+
+
+class EntryStore(Protocol):
+    """Persistence interface shared by the JSON and SQLite entry backends."""
+
+    def load_month(self, key: str) -> List[Entry]: ...
+
+    def save_month(self, key: str, entries: List[Entry]) -> None: ...
+
+    def save_entry(self, key: str, entries: List[Entry], entry: Entry) -> None: ...
+
+    def remove_entry(self, key: str, entries: List[Entry], entry_id: str) -> None: ...
+
+    def load_all(self) -> Dict[str, List[Entry]]: ...
+
+    def load_months(self, keys: Iterable[str]) -> Dict[str, List[Entry]]: ...
+
+    def month_keys(self) -> List[str]: ...
+
+    def read_open_hint(self) -> Optional[List[str]]: ...
+
+    def write_open_hint(self, month_keys: List[str]) -> None: ...
+
+    def sync(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class AbsenceStore(Protocol):
+    """Persistence interface shared by the JSON and SQLite absence backends."""
+
+    def load_all(self) -> List[AbsenceRule]: ...
+
+    def save_rules(self, rules: Iterable[AbsenceRule]) -> None: ...
+
+    def save_years(self, rules: Iterable[AbsenceRule], years: Iterable[int]) -> None:
+        """Persist only the rules of ``years`` from the full rule list ``rules``."""
+        ...
+
+    def sync(self) -> None: ...
+
+    def close(self) -> None: ...
 
 
 @dataclass
 class EntryStorage:
+    """
+    Stores entries as one JSON file per month.
+
+    With ``journal`` enabled, single-entry mutations are appended as compact
+    records to ``journal/<year>-<month>.log`` instead of rewriting the month
+    file. Loads replay the log on top of the month snapshot, and the log is
+    folded back into the snapshot once it grows past ``compact_threshold``
+    records or when the storage is closed.
+
+    With ``snapshot_cache`` enabled, parsed month files are kept in a pickled
+    snapshot so unchanged months skip JSON parsing on the next start.
+
+    Month files are parsed with ``codec`` and written with
+    :func:`encode_month`; ``indent=False`` writes them without whitespace.
+
+    ``load_all`` reads months on ``load_workers`` threads (or processes with
+    ``load_executor="process"``); the result keeps the sorted month order.
+
+    Files are replaced atomically; ``fsync_policy`` decides when they are
+    flushed to disk (see :class:`FileSyncer`). Writes are serialized by an
+    internal lock, so the storage can be shared between threads.
+
+    ``month_format="columnar"`` writes months as binary ``<key>.cols`` files
+    (see :mod:`.columnar`) that :meth:`month_columns` can scan through
+    ``mmap`` without building entries; either format is read back, and
+    :meth:`export_json` writes plain JSON months for interop.
+
+    Whole years can be rolled into ``archive/<year>.json.<ext>`` (see
+    :meth:`archive_year`); with ``archive`` enabled, years before the current
+    one are rolled on ``close``. Archived months are listed from
+    ``archive/index.json`` and a year is only decompressed once one of its
+    months is loaded. Writing to an archived month creates a regular month
+    file again, which takes precedence over the archived copy.
+    """
+
     base_dir: Path = Path("data/entries")
+    journal: bool = False
+    compact_threshold: int = 200
+    snapshot_cache: bool = False
+    codec: JsonCodec = field(default_factory=JsonCodec)
+    indent: bool = True
+    load_workers: int = 1
+    load_executor: str = "thread"
+    fsync_policy: FsyncPolicy = FsyncPolicy.NEVER
+    fsync_interval: float = 1.0
+    archive: bool = False
+    archive_compression: str = "gzip"
+    month_format: str = "json"
+    _journal_counts: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _journal_checked: Set[str] = field(default_factory=set, init=False, repr=False)
+    _cache: Optional[SnapshotCache] = field(default=None, init=False, repr=False)
+    _syncer: FileSyncer = field(init=False, repr=False)
+    _archive_index: Optional[Dict[str, Dict[str, Any]]] = field(default=None, init=False, repr=False)
+    _archived_years: Dict[str, Dict[str, List[Entry]]] = field(default_factory=dict, init=False, repr=False)
+    _archive_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _write_lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.base_dir = Path(self.base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._syncer = FileSyncer(self.fsync_policy, self.fsync_interval)
+        if self.snapshot_cache:
+            self._cache = SnapshotCache(self.base_dir / SNAPSHOT_CACHE_NAME)
+        if self.archive_compression not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive compression: {self.archive_compression}")
+        if self.month_format not in MONTH_FORMATS:
+            raise ValueError(f"Unknown month format: {self.month_format}")
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats if self._cache else CacheStats()
 
     @staticmethod
     def month_key_from_date(target: date) -> str:
@@ -30,34 +454,313 @@ class EntryStorage:
         year, month = key.split("-")
         return int(year), int(month)
 
+    @property
+    def journal_dir(self) -> Path:
+        return self.base_dir / "journal"
+
     def _path_for_key(self, key: str) -> Path:
         return self.base_dir / f"{key}.json"
 
+    def _columns_path_for_key(self, key: str) -> Path:
+        return self.base_dir / f"{key}{COLUMNAR_SUFFIX}"
+
+    def _stored_month_path(self, key: str) -> Optional[Path]:
+        for path in (self._columns_path_for_key(key), self._path_for_key(key)):
+            if path.exists():
+                return path
+        return None
+
     def _path_for_date(self, target: date) -> Path:
         return self._path_for_key(self.month_key_from_date(target))
 
+    def _journal_path_for_key(self, key: str) -> Path:
+        return self.journal_dir / f"{key}.log"
+
+    @property
+    def archive_dir(self) -> Path:
+        return self.base_dir / "archive"
+
+    @property
+    def _open_hint_path(self) -> Path:
+        return self.base_dir / "open-months.hint"
+
     def load_month(self, key: str) -> List[Entry]:
-        path = self._path_for_key(key)
-        if not path.exists():
-            return []
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
-        return [Entry.from_dict(item) for item in payload]
+        path = self._stored_month_path(key)
+        entries: List[Entry] = []
+        if path is not None and self._cache:
+            entries = self._cache.get(path, self._read_month_file)
+        elif path is not None:
+            entries = self._read_month_file(path)
+        elif self._is_archived(key):
+            entries = self._load_archived_month(key)
+        return self._replay_journal(key, entries)
 
     def save_month(self, key: str, entries: List[Entry]) -> None:
-        path = self._path_for_key(key)
-        data = [entry.to_dict() for entry in entries]
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2)
+        with self._write_lock:
+            if self.month_format == "columnar":
+                path, stale = self._columns_path_for_key(key), self._path_for_key(key)
+                self._syncer.write(path, encode_columns(entries))
+            else:
+                path, stale = self._path_for_key(key), self._columns_path_for_key(key)
+                self._syncer.write(path, encode_month(entries, indent=self.indent))
+            stale.unlink(missing_ok=True)
+            if self._cache:
+                self._cache.put(path, entries)
+            self._discard_journal(key)
+
+    def save_entry(self, key: str, entries: List[Entry], entry: Entry) -> None:
+        """Persist ``entry`` after it was added to or updated within ``entries``."""
+        with self._write_lock:
+            if not self.journal:
+                self.save_month(key, entries)
+                return
+            self._append_journal(key, entries, {"op": "put", **entry.to_dict()})
+
+    def remove_entry(self, key: str, entries: List[Entry], entry_id: str) -> None:
+        """Persist the removal of ``entry_id`` from the month that now holds ``entries``."""
+        with self._write_lock:
+            if not self.journal:
+                self.save_month(key, entries)
+                return
+            self._append_journal(key, entries, {"op": "del", "id": entry_id})
 
     def load_all(self) -> Dict[str, List[Entry]]:
         result: Dict[str, List[Entry]] = defaultdict(list)
-        for path in sorted(self.base_dir.glob("*.json")):
-            key = path.stem
+        result.update(self.load_months(self.month_keys()))
+        if self._cache:
+            self._cache.retain(path.name for path in map(self._stored_month_path, result) if path)
+            self._cache.save()
+            stats = self._cache.stats
+            logger.info("Entry snapshot cache: %d hit(s), %d miss(es)", stats.hits, stats.misses)
+        return result
+
+    def load_months(self, keys: Iterable[str]) -> Dict[str, List[Entry]]:
+        """Load ``keys`` concurrently, returning them in the order given."""
+        keys = list(keys)
+        if self.load_workers <= 1 or len(keys) <= 1:
+            return {key: self.load_month(key) for key in keys}
+        if self.load_executor == "process":
+            # Each worker parses with a fresh storage; the snapshot cache
+            # only lives in this process, so it is bypassed here.
+            with ProcessPoolExecutor(max_workers=self.load_workers) as executor:
+                months = executor.map(
+                    _load_month_in_worker,
+                    [(self.base_dir, self.journal, self.codec.name, key) for key in keys],
+                )
+                return dict(zip(keys, months))
+        with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+            return dict(zip(keys, executor.map(self.load_month, keys)))
+
+    def month_keys(self) -> List[str]:
+        keys = self._loose_month_keys()
+        keys.update(self._archived_month_keys())
+        return sorted(keys)
+
+    def _loose_month_keys(self) -> set[str]:
+        keys = {path.stem for path in self.base_dir.glob("*.json")}
+        keys.update(path.stem for path in self.base_dir.glob(f"*{COLUMNAR_SUFFIX}"))
+        if self.journal_dir.exists():
+            keys.update(path.stem for path in self.journal_dir.glob("*.log"))
+        return keys
+
+    def month_columns(self, key: str) -> Optional[MonthColumns]:
+        """
+        Map the columnar file of ``key`` for scanning, or ``None`` if the month
+        is not stored as columns. Journal records not yet compacted are not
+        included; the caller closes the returned view.
+        """
+        return read_columns(self._columns_path_for_key(key))
+
+    def export_json(self, target_dir: Path) -> int:
+        """Write every month as an indented JSON file to ``target_dir``; returns the month count."""
+        target_dir = Path(target_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        months = self.load_months(self.month_keys())
+        for key, entries in months.items():
+            atomic_write_bytes(target_dir / f"{key}.json", encode_month(entries))
+        return len(months)
+
+    def read_open_hint(self) -> Optional[List[str]]:
+        """Return the months known to hold an open entry, or ``None`` when unknown."""
+        path = self._open_hint_path
+        if not path.exists():
+            return None
+        try:
             with path.open("r", encoding="utf-8") as handle:
                 payload = json.load(handle)
-            result[key] = [Entry.from_dict(item) for item in payload]
-        return result
+        except ValueError:
+            return None
+        return sorted(str(key) for key in payload)
+
+    def write_open_hint(self, month_keys: List[str]) -> None:
+        with self._write_lock:
+            self._syncer.write(self._open_hint_path, json.dumps(sorted(month_keys)).encode("utf-8"))
+
+    def sync(self) -> None:
+        """Flush files written under the ``batch`` fsync policy."""
+        self._syncer.sync()
+
+    def compact(self) -> None:
+        """Fold every pending journal into its month snapshot."""
+        with self._write_lock:
+            if not self.journal_dir.exists():
+                return
+            for path in sorted(self.journal_dir.glob("*.log")):
+                self.save_month(path.stem, self.load_month(path.stem))
+
+    def archive_year(self, year: int) -> None:
+        """
+        Roll every month of ``year`` into one compressed archive file.
+
+        Loose month files and journals of that year are folded in (they take
+        precedence over a previous archive of the same year) and removed.
+        """
+        with self._write_lock:
+            prefix = f"{year:04d}-"
+            keys = [key for key in self.month_keys() if key.startswith(prefix)]
+            if not keys:
+                return
+            months = {key: entries for key, entries in self.load_months(keys).items() if entries}
+            suffix, compress, _ = ARCHIVE_FORMATS[self.archive_compression]
+            name = f"{year:04d}.json{suffix}"
+            payload = {key: [entry.to_dict() for entry in entries] for key, entries in months.items()}
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            self._syncer.write(self.archive_dir / name, compress(self.codec.dumps(payload, indent=False)))
+            index = dict(self._read_archive_index())
+            previous = index.get(str(year))
+            index[str(year)] = {"file": name, "months": sorted(months)}
+            # The index is written before the loose files go away, so a crash
+            # in between leaves duplicates (which the month files win) but no gaps.
+            index_bytes = json.dumps(index, indent=2).encode("utf-8")
+            self._syncer.write(self.archive_dir / ARCHIVE_INDEX_NAME, index_bytes)
+            with self._archive_lock:
+                self._archive_index = index
+                self._archived_years[str(year)] = months
+            if previous and previous["file"] != name:
+                (self.archive_dir / previous["file"]).unlink(missing_ok=True)
+            for key in keys:
+                self._path_for_key(key).unlink(missing_ok=True)
+                self._columns_path_for_key(key).unlink(missing_ok=True)
+                self._discard_journal(key)
+
+    def archive_closed_years(self, current_year: Optional[int] = None) -> List[int]:
+        """Archive every year before ``current_year`` that still has loose files."""
+        current_year = current_year or date.today().year
+        years = sorted({self.year_month_from_key(key)[0] for key in self._loose_month_keys()})
+        closed = [year for year in years if year < current_year]
+        for year in closed:
+            self.archive_year(year)
+        return closed
+
+    def close(self) -> None:
+        with self._write_lock:
+            self.compact()
+            if self.archive:
+                self.archive_closed_years()
+            self.sync()
+            if self._cache:
+                self._cache.save()
+
+    def _read_month_file(self, path: Path) -> List[Entry]:
+        if path.suffix == COLUMNAR_SUFFIX:
+            return decode_columns(path)
+        return decode_month(path.read_bytes(), self.codec)
+
+    # ------------------------------------------------------------------
+    # Archive helpers
+    def _read_archive_index(self) -> Dict[str, Dict[str, Any]]:
+        with self._archive_lock:
+            if self._archive_index is None:
+                path = self.archive_dir / ARCHIVE_INDEX_NAME
+                self._archive_index = json.loads(path.read_bytes()) if path.exists() else {}
+            return self._archive_index
+
+    def _archived_month_keys(self) -> set[str]:
+        return {key for year in self._read_archive_index().values() for key in year["months"]}
+
+    def _is_archived(self, key: str) -> bool:
+        year = self._read_archive_index().get(key[:4])
+        return year is not None and key in year["months"]
+
+    def _load_archived_month(self, key: str) -> List[Entry]:
+        year = key[:4]
+        with self._archive_lock:
+            months = self._archived_years.get(year)
+            if months is None:
+                months = self._read_archive(self._archive_index[year]["file"])
+                self._archived_years[year] = months
+        return list(months.get(key, []))
+
+    def _read_archive(self, name: str) -> Dict[str, List[Entry]]:
+        path = self.archive_dir / name
+        decompress = next(fmt[2] for fmt in ARCHIVE_FORMATS.values() if path.name.endswith(fmt[0]))
+        payload = self.codec.loads(decompress(path.read_bytes()))
+        return {key: [Entry.from_dict(item) for item in items] for key, items in payload.items()}
+
+    # ------------------------------------------------------------------
+    # Journal helpers
+    def _append_journal(self, key: str, entries: List[Entry], record: dict) -> None:
+        count = self._journal_counts.get(key, 0) + 1
+        if count >= self.compact_threshold:
+            self.save_month(key, entries)
+            return
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        path = self._journal_path_for_key(key)
+        line = self.codec.dumps(record, indent=False) + b"\n"
+        if key not in self._journal_checked:
+            # An earlier append may have been interrupted mid-record; start a
+            # fresh line so this record is not glued onto the torn one.
+            if not _ends_with_newline(path):
+                line = b"\n" + line
+            self._journal_checked.add(key)
+        self._syncer.append(path, line)
+        self._journal_counts[key] = count
+
+    def _replay_journal(self, key: str, entries: List[Entry]) -> List[Entry]:
+        path = self._journal_path_for_key(key)
+        if not path.exists():
+            return entries
+        by_id = {entry.id: entry for entry in entries}
+        count = 0
+        with path.open("rb") as handle:
+            for line in handle:
+                try:
+                    record = self.codec.loads(line)
+                except ValueError:
+                    # A torn trailing record from an interrupted append; the
+                    # mutation never completed, so it is safe to drop.
+                    continue
+                count += 1
+                if record.get("op") == "del":
+                    by_id.pop(record["id"], None)
+                else:
+                    by_id[record["id"]] = Entry.from_dict(record)
+        self._journal_counts[key] = count
+        return sorted(by_id.values(), key=lambda entry: entry.start)
+
+    def _discard_journal(self, key: str) -> None:
+        self._journal_counts.pop(key, None)
+        self._journal_checked.discard(key)
+        path = self._journal_path_for_key(key)
+        if path.exists():
+            path.unlink()
+
+
+def _ends_with_newline(path: Path) -> bool:
+    """Whether ``path`` is missing, empty or ends with a newline."""
+    try:
+        with path.open("rb") as handle:
+            if handle.seek(0, os.SEEK_END) == 0:
+                return True
+            handle.seek(-1, os.SEEK_END)
+            return handle.read(1) == b"\n"
+    except FileNotFoundError:
+        return True
+
+
+def _load_month_in_worker(args: tuple[Path, bool, str, str]) -> List[Entry]:
+    base_dir, journal, codec_name, key = args
+    return EntryStorage(base_dir=base_dir, journal=journal, codec=get_codec(codec_name)).load_month(key)
 
 
 def _to_payload(rule: AbsenceRule) -> dict:
@@ -82,10 +785,26 @@ def _from_payload(payload: dict) -> AbsenceRule:
 @dataclass
 class AbsenceStorage:
     base_dir: Path = Path("data/absences")
+    snapshot_cache: bool = False
+    codec: JsonCodec = field(default_factory=JsonCodec)
+    indent: bool = True
+    load_workers: int = 1
+    fsync_policy: FsyncPolicy = FsyncPolicy.NEVER
+    fsync_interval: float = 1.0
+    _cache: Optional[SnapshotCache] = field(default=None, init=False, repr=False)
+    _syncer: FileSyncer = field(init=False, repr=False)
+    _write_lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.base_dir = Path(self.base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._syncer = FileSyncer(self.fsync_policy, self.fsync_interval)
+        if self.snapshot_cache:
+            self._cache = SnapshotCache(self.base_dir / SNAPSHOT_CACHE_NAME)
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats if self._cache else CacheStats()
 
     def _path_for_year(self, year: int) -> Path:
         return self.base_dir / f"{year}.json"
@@ -94,37 +813,81 @@ class AbsenceStorage:
         path = self._path_for_year(year)
         if not path.exists():
             return []
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
-        return [_from_payload(item) for item in payload]
+        if self._cache:
+            return self._cache.get(path, self._read_year_file)
+        return self._read_year_file(path)
+
+    def _read_year_file(self, path: Path) -> List[AbsenceRule]:
+        return [_from_payload(item) for item in self.codec.loads(path.read_bytes())]
 
     def load_all(self) -> List[AbsenceRule]:
-        rules: List[AbsenceRule] = []
+        years: List[int] = []
         for path in sorted(self.base_dir.glob("*.json")):
             try:
-                year = int(path.stem)
+                years.append(int(path.stem))
             except ValueError:
                 continue
-            rules.extend(self.load_year(year))
+        if self.load_workers > 1 and len(years) > 1:
+            with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+                per_year = list(executor.map(self.load_year, years))
+        else:
+            per_year = [self.load_year(year) for year in years]
+        rules = [rule for year_rules in per_year for rule in year_rules]
+        loaded = [self._path_for_year(year).name for year in years]
         rules.sort(key=lambda r: (r.start, r.end or r.start, r.reason))
+        if self._cache:
+            self._cache.retain(loaded)
+            self._cache.save()
+            stats = self._cache.stats
+            logger.info("Absence snapshot cache: %d hit(s), %d miss(es)", stats.hits, stats.misses)
         return rules
 
     def save_rules(self, rules: Iterable[AbsenceRule]) -> None:
-        buckets: Dict[int, List[AbsenceRule]] = {}
-        for rule in rules:
-            buckets.setdefault(rule.start.year, []).append(rule)
-        existing_years = {int(path.stem) for path in self.base_dir.glob("*.json") if path.stem.isdigit()}
-        for year, year_rules in buckets.items():
-            payload = [
-                _to_payload(rule)
-                for rule in sorted(year_rules, key=lambda r: (r.start, r.end or r.start, r.reason))
-            ]
-            with self._path_for_year(year).open("w", encoding="utf-8") as handle:
-                json.dump(payload, handle, indent=2)
-        for stale_year in existing_years - buckets.keys():
-            stale_path = self._path_for_year(stale_year)
-            if stale_path.exists():
-                stale_path.unlink()
+        with self._write_lock:
+            buckets: Dict[int, List[AbsenceRule]] = {}
+            for rule in rules:
+                buckets.setdefault(rule.start.year, []).append(rule)
+            existing_years = {int(path.stem) for path in self.base_dir.glob("*.json") if path.stem.isdigit()}
+            for year, year_rules in buckets.items():
+                sorted_rules = sorted(year_rules, key=lambda r: (r.start, r.end or r.start, r.reason))
+                payload = [_to_payload(rule) for rule in sorted_rules]
+                self._syncer.write(self._path_for_year(year), self.codec.dumps(payload, indent=self.indent))
+                if self._cache:
+                    self._cache.put(self._path_for_year(year), sorted_rules)
+            for stale_year in existing_years - buckets.keys():
+                stale_path = self._path_for_year(stale_year)
+                if stale_path.exists():
+                    stale_path.unlink()
+            if self._cache:
+                self._cache.retain(f"{year}.json" for year in buckets)
+                self._cache.save()
+
+    def save_years(self, rules: Iterable[AbsenceRule], years: Iterable[int]) -> None:
+        with self._write_lock:
+            buckets: Dict[int, List[AbsenceRule]] = {year: [] for year in years}
+            for rule in rules:
+                if rule.start.year in buckets:
+                    buckets[rule.start.year].append(rule)
+            for year, year_rules in buckets.items():
+                path = self._path_for_year(year)
+                if not year_rules:
+                    if path.exists():
+                        path.unlink()
+                    continue
+                sorted_rules = sorted(year_rules, key=lambda r: (r.start, r.end or r.start, r.reason))
+                payload = [_to_payload(rule) for rule in sorted_rules]
+                self._syncer.write(path, self.codec.dumps(payload, indent=self.indent))
+                if self._cache:
+                    self._cache.put(path, sorted_rules)
+            if self._cache:
+                self._cache.retain(path.name for path in self.base_dir.glob("*.json") if path.stem.isdigit())
+                self._cache.save()
+
+    def sync(self) -> None:
+        self._syncer.sync()
+
+    def close(self) -> None:
+        self.sync()
 
 
 def _to_payload(rule: AbsenceRule) -> dict:
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from .events import ChangeBus
+from .events import ChangeEvent
 from .models import AbsenceRule
 from .models import Config
 from .models import Entry
@@ -7,14 +9,26 @@ from dataclasses import dataclass
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
+from itertools import accumulate
+from typing import Callable
+from typing import Dict
 from typing import Generic
 from typing import Iterable
 from typing import List
+from typing import Optional
 from typing import Protocol
 from typing import Sequence
+from typing import Set
 from typing import Tuple
 from typing import TypeVar
 
+import threading
+
+try:  # pragma: no cover - optional speedup
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 _EPSILON = 1e-6
 
 
@@ -103,6 +117,46 @@ class ConfigAbsenceRetriever:
         return [rule for rule in self.config.absences if rule.includes(target)]
 
 
+class AbsenceIndex:
+    """
+    Absence retriever over a list of rules, indexed by day.
+
+    Each rule is expanded into a day -> rules map, so a lookup is one dict
+    access instead of a scan of every rule. Rules spanning more than
+    ``max_span_days`` stay in a short list that is still scanned. Matches
+    keep the order of the rule list. Call :meth:`rebuild` whenever the
+    rules change.
+    """
+
+    def __init__(self, rules: Iterable[AbsenceRule] = (), *, max_span_days: int = 366) -> None:
+        self.max_span_days = max_span_days
+        self._by_day: Dict[date, List[Tuple[int, AbsenceRule]]] = {}
+        self._long: List[Tuple[int, AbsenceRule]] = []
+        self.rebuild(rules)
+
+    def rebuild(self, rules: Iterable[AbsenceRule]) -> None:
+        by_day: Dict[date, List[Tuple[int, AbsenceRule]]] = {}
+        long_rules: List[Tuple[int, AbsenceRule]] = []
+        for position, rule in enumerate(rules):
+            span = ((rule.end or rule.start) - rule.start).days + 1
+            if span > self.max_span_days:
+                long_rules.append((position, rule))
+                continue
+            for offset in range(span):
+                by_day.setdefault(rule.start + timedelta(days=offset), []).append((position, rule))
+        # Swapped in one step so concurrent lookups see either index whole.
+        self._by_day, self._long = by_day, long_rules
+
+    def absences_for_day(self, target: date) -> Sequence[AbsenceRule]:
+        by_day, long_rules = self._by_day, self._long
+        matches = by_day.get(target, [])
+        if long_rules:
+            extra = [item for item in long_rules if item[1].includes(target)]
+            if extra:
+                matches = sorted([*matches, *extra], key=lambda item: item[0])
+        return [rule for _, rule in matches]
+
+
 def summarize_day(
     day: date,
     periods: Sequence[Entry],
@@ -138,13 +192,22 @@ def summarize_day(
 
 
 def summarize_range(day_summaries: Sequence[DayWorkSummary]) -> RangeSummary:
+    expected = worked = remaining = overworked = 0.0
+    workdays = worked_days = 0
+    for day in day_summaries:
+        expected += day.expected
+        worked += day.worked
+        remaining += day.remaining
+        overworked += day.overworked
+        workdays += day.is_workday
+        worked_days += day.worked_day
     return RangeSummary(
-        total_expected=sum(day.expected for day in day_summaries),
-        total_worked=sum(day.worked for day in day_summaries),
-        total_remaining=sum(day.remaining for day in day_summaries),
-        total_overworked=sum(day.overworked for day in day_summaries),
-        workdays=sum(1 for day in day_summaries if day.is_workday),
-        worked_days=sum(1 for day in day_summaries if day.worked_day),
+        total_expected=expected,
+        total_worked=worked,
+        total_remaining=remaining,
+        total_overworked=overworked,
+        workdays=workdays,
+        worked_days=worked_days,
     )
 
 
@@ -156,6 +219,7 @@ def get_day_summary(
     absence_retriever: AbsenceRetriever,
     config: Config,
     now: datetime | None = None,
+    cache: DayDetailsCache | None = None,
 ) -> SummaryResult[DayDetails]:
     if start != end:
         raise ValueError("Day summaries require matching start and end dates")
@@ -166,6 +230,7 @@ def get_day_summary(
         absence_retriever=absence_retriever,
         config=config,
         now=now,
+        cache=cache,
     )
     if not day_records:
         raise ValueError("No days available for provided range")
@@ -181,6 +246,7 @@ def get_week_summary(
     absence_retriever: AbsenceRetriever,
     config: Config,
     now: datetime | None = None,
+    cache: DayDetailsCache | None = None,
 ) -> SummaryResult[WeekDetails]:
     days = _build_day_details(
         start,
@@ -189,6 +255,7 @@ def get_week_summary(
         absence_retriever=absence_retriever,
         config=config,
         now=now,
+        cache=cache,
     )
     week = WeekDetails(
         start=days[0].date if days else start,
@@ -207,6 +274,7 @@ def get_month_summary(
     absence_retriever: AbsenceRetriever,
     config: Config,
     now: datetime | None = None,
+    cache: DayDetailsCache | None = None,
 ) -> SummaryResult[MonthDetails]:
     days = _build_day_details(
         start,
@@ -215,6 +283,7 @@ def get_month_summary(
         absence_retriever=absence_retriever,
         config=config,
         now=now,
+        cache=cache,
     )
     weeks = tuple(_group_days_by_week(days))
     month = MonthDetails(
@@ -236,6 +305,7 @@ def get_year_summary(
     absence_retriever: AbsenceRetriever,
     config: Config,
     now: datetime | None = None,
+    cache: DayDetailsCache | None = None,
 ) -> SummaryResult[YearDetails]:
     days = _build_day_details(
         start,
@@ -244,6 +314,7 @@ def get_year_summary(
         absence_retriever=absence_retriever,
         config=config,
         now=now,
+        cache=cache,
     )
     months = tuple(_group_days_by_month(days))
     year_details = YearDetails(
@@ -256,6 +327,263 @@ def get_year_summary(
     return SummaryResult(summary=summary, period=year_details)
 
 
+def get_range_summary(
+    start: date,
+    end: date,
+    *,
+    entry_retriever: EntryRetriever,
+    absence_retriever: AbsenceRetriever,
+    config: Config,
+    now: datetime | None = None,
+) -> RangeSummary:
+    """
+    The ``summary`` of ``get_*_summary`` over ``start``..``end``, without building per-day details.
+
+    With NumPy installed, expected hours (workday mask minus absence
+    credit), worked, remaining and overworked are computed as arrays over
+    the whole range at once. Retrievers that provide ``worked_hours_by_day``
+    (``column_store.ColumnEntryRetriever``) are asked for worked hours in
+    one call; others are summed per day. Without NumPy this falls back to
+    the per-day functions.
+    """
+    if end < start:
+        return summarize_range([])
+    if np is None:
+        days = _build_day_details(
+            start,
+            end,
+            entry_retriever=entry_retriever,
+            absence_retriever=absence_retriever,
+            config=config,
+            now=now,
+        )
+        return summarize_range([day.summary for day in days])
+    count = (end - start).days + 1
+    ordinals = np.arange(start.toordinal(), end.toordinal() + 1)
+    if config.workdays:
+        is_workday = np.isin((ordinals - 1) % 7, list(config.workdays))  # ordinal 1 is a Monday
+    else:
+        is_workday = np.ones(count, dtype=bool)
+    today = date.today()
+    today_index = (today - start).days if start <= today <= end else None
+    worked_by_day = getattr(entry_retriever, "worked_hours_by_day", None)
+    if worked_by_day is not None:
+        worked = np.asarray(worked_by_day(start, end, now=now), dtype=np.float64)
+    else:
+        worked = np.zeros(count)
+        for index, target in enumerate(_iter_days(start, end)):
+            reference_now = now if index == today_index else None
+            entries = _normalize_entries(entry_retriever.entries_for_day(target), target)
+            worked[index] = sum(entry.duration_hours(now=reference_now) for entry in entries)
+    credit = np.zeros(count)
+    for index in np.flatnonzero(is_workday).tolist():
+        # Absences only reduce the expected hours of workdays.
+        absences = absence_retriever.absences_for_day(start + timedelta(days=index))
+        credit[index] = _absence_hours(absences, config)
+    expected = np.maximum(np.where(is_workday, float(config.hours_per_day), 0.0) - credit, 0.0)
+    return RangeSummary(
+        total_expected=float(expected.sum()),
+        total_worked=float(worked.sum()),
+        total_remaining=float(np.maximum(expected - worked, 0.0).sum()),
+        total_overworked=float(np.maximum(worked - expected, 0.0).sum()),
+        workdays=int(is_workday.sum()),
+        worked_days=int((worked > _EPSILON).sum()),
+    )
+
+
+def _config_key(config: Config) -> tuple:
+    """The config values a day summary depends on, besides its entries and absences."""
+    return config.hours_per_day, tuple(config.workdays)
+
+
+class DayDetailsCache:
+    """
+    Memoized :class:`DayDetails` per date for the ``get_*_summary`` functions.
+
+    A cached day is reused until its entries or absences change, or until
+    ``hours_per_day``/``workdays`` differ from the ones it was computed
+    with. Change events (or ``invalidate``) drop the affected dates. Days
+    holding a running entry are never stored, so their live time stays
+    current.
+    """
+
+    def __init__(self, events: Optional[ChangeBus] = None) -> None:
+        self._days: Dict[date, Tuple[tuple, DayDetails]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        """Bumped by every invalidation; results computed before one are not stored."""
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        if events is not None:
+            self._unsubscribe = events.subscribe(self._handle_change)
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def get(self, day: date, config_key: tuple) -> Optional[DayDetails]:
+        cached = self._days.get(day)
+        if cached is None or cached[0] != config_key:
+            return None
+        return cached[1]
+
+    def put(self, details: DayDetails, config_key: tuple, generation: int) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._days[details.date] = (config_key, details)
+
+    def invalidate(self, start: date, end: date) -> None:
+        with self._lock:
+            self.generation += 1
+            for day in [day for day in self._days if start <= day <= end]:
+                del self._days[day]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._days.clear()
+
+    def close(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _handle_change(self, event: ChangeEvent) -> None:
+        self.invalidate(event.first_day, event.last_day)
+
+
+# expected, worked, remaining, overworked, workday, worked day
+_Row = Tuple[float, float, float, float, int, int]
+_ZERO: _Row = (0.0, 0.0, 0.0, 0.0, 0, 0)
+
+
+def _row(summary: DayWorkSummary) -> _Row:
+    return (
+        summary.expected,
+        summary.worked,
+        summary.remaining,
+        summary.overworked,
+        int(summary.is_workday),
+        int(summary.worked_day),
+    )
+
+
+class DailyLedger:
+    """
+    Per-day summary rows with running totals, for :class:`RangeSummary` lookups.
+
+    Each covered day holds its ``summarize_day`` values without a running
+    entry's live time, and ``prefix[i]`` is the sum of the first ``i`` rows,
+    so a range total is ``prefix[end + 1] - prefix[start]``. When ``now`` is
+    given and the range includes today, today's row is swapped for a live
+    one, which is what ``get_*_summary`` do with ``now``.
+
+    The ledger grows a whole year at a time as queries reach new dates.
+    Change events only mark their days stale; stale rows are recomputed
+    and the totals re-accumulated on the next query. A change to
+    ``hours_per_day`` or ``workdays`` rebuilds every row.
+    """
+
+    def __init__(
+        self,
+        *,
+        entry_retriever: EntryRetriever,
+        absence_retriever: AbsenceRetriever,
+        config: Config,
+        events: Optional[ChangeBus] = None,
+    ) -> None:
+        self.entry_retriever = entry_retriever
+        self.absence_retriever = absence_retriever
+        self.config = config
+        self._lock = threading.Lock()
+        self._origin: Optional[date] = None
+        self._rows: List[_Row] = []
+        self._prefix: List[List[float]] = []
+        self._stale: Set[int] = set()
+        self._config_key = self._current_config_key()
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        if events is not None:
+            self._unsubscribe = events.subscribe(self._handle_change)
+
+    def close(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def invalidate(self, start: date, end: date) -> None:
+        """Mark ``start``..``end`` as changed; their rows are recomputed on the next query."""
+        with self._lock:
+            if self._origin is None:
+                return
+            first = max((start - self._origin).days, 0)
+            last = min((end - self._origin).days, len(self._rows) - 1)
+            self._stale.update(range(first, last + 1))
+
+    def summary(self, start: date, end: date, *, now: Optional[datetime] = None) -> RangeSummary:
+        if end < start:
+            return summarize_range([])
+        with self._lock:
+            self._cover(start, end)
+            self._refresh()
+            first = (start - self._origin).days
+            last = (end - self._origin).days + 1
+            totals = [column[last] - column[first] for column in self._prefix]
+            today = date.today()
+            if now is not None and start <= today <= end:
+                stored = self._rows[(today - self._origin).days]
+                live = _row(self._summarize(today, now))
+                totals = [total - old + new for total, old, new in zip(totals, stored, live)]
+        return RangeSummary(
+            total_expected=totals[0],
+            total_worked=totals[1],
+            total_remaining=totals[2],
+            total_overworked=totals[3],
+            workdays=int(totals[4]),
+            worked_days=int(totals[5]),
+        )
+
+    # ------------------------------------------------------------------
+    def _handle_change(self, event: ChangeEvent) -> None:
+        self.invalidate(event.first_day, event.last_day)
+
+    def _current_config_key(self) -> tuple:
+        return _config_key(self.config)
+
+    def _summarize(self, day: date, now: Optional[datetime] = None) -> DayWorkSummary:
+        entries = _normalize_entries(self.entry_retriever.entries_for_day(day), day)
+        absences = tuple(self.absence_retriever.absences_for_day(day))
+        return summarize_day(day, entries, absences, config=self.config, now=now)
+
+    def _cover(self, start: date, end: date) -> None:
+        first = date(start.year, 1, 1)
+        last = date(end.year, 12, 31)
+        if self._origin is None:
+            self._origin = first
+            self._rows = [_ZERO] * ((last - first).days + 1)
+            self._stale = set(range(len(self._rows)))
+            return
+        if first < self._origin:
+            added = (self._origin - first).days
+            self._rows[:0] = [_ZERO] * added
+            self._stale = {index + added for index in self._stale} | set(range(added))
+            self._origin = first
+        covered_last = self._origin + timedelta(days=len(self._rows) - 1)
+        if last > covered_last:
+            added = (last - covered_last).days
+            self._stale.update(range(len(self._rows), len(self._rows) + added))
+            self._rows.extend([_ZERO] * added)
+
+    def _refresh(self) -> None:
+        key = self._current_config_key()
+        if key != self._config_key:
+            self._config_key = key
+            self._stale = set(range(len(self._rows)))
+        if not self._stale and self._prefix:
+            return
+        for index in sorted(self._stale):
+            self._rows[index] = _row(self._summarize(self._origin + timedelta(days=index)))
+        self._stale.clear()
+        self._prefix = [list(accumulate(column, initial=0)) for column in zip(*self._rows)]
+
+
 def _build_day_details(
     start: date,
     end: date,
@@ -264,24 +592,46 @@ def _build_day_details(
     absence_retriever: AbsenceRetriever,
     config: Config,
     now: datetime | None,
+    cache: DayDetailsCache | None = None,
 ) -> List[DayDetails]:
     results: List[DayDetails] = []
     today = date.today()
+    config_key = _config_key(config)
+    generation = cache.generation if cache is not None else 0
     for target in _iter_days(start, end):
+        cached = cache.get(target, config_key) if cache is not None else None
+        if cached is not None:
+            results.append(cached)
+            continue
         entries = _normalize_entries(entry_retriever.entries_for_day(target), target)
         absences = tuple(absence_retriever.absences_for_day(target))
         reference_now = now if (now is not None and target == today) else None
         summary = summarize_day(target, entries, absences, config=config, now=reference_now)
-        results.append(DayDetails(date=target, entries=entries, absences=absences, summary=summary))
+        details = DayDetails(date=target, entries=entries, absences=absences, summary=summary)
+        if cache is not None and not any(entry.is_open for entry in entries):
+            cache.put(details, config_key, generation)
+        results.append(details)
     return results
 
 
 def _normalize_entries(entries: Sequence[Entry], target: date) -> Tuple[Entry, ...]:
+    if isinstance(entries, tuple) and _is_sorted_day(entries, target):
+        # TrackerState's day buckets are already filtered and sorted.
+        return entries
     filtered = [entry for entry in entries if entry.start.date() == target]
     filtered.sort(key=lambda entry: entry.start)
     return tuple(filtered)
 
 
+def _is_sorted_day(entries: Tuple[Entry, ...], target: date) -> bool:
+    previous = None
+    for entry in entries:
+        if entry.start.date() != target or (previous is not None and entry.start < previous):
+            return False
+        previous = entry.start
+    return True
+
+
 def _group_days_by_week(days: Sequence[DayDetails]) -> List[WeekDetails]:
     if not days:
         return []
@@ -13,11 +13,10 @@ if TYPE_CHECKING:  # pragma: no cover
 
 def absence_labels_for_day(app: TrackerApp, target_day: date) -> list[str]:
     labels: list[str] = []
-    for rule in app.config.absences:
-        if rule.includes(target_day):
-            credit_hours = rule.hours if rule.hours is not None else app.config.hours_per_day
-            reason = rule.reason or "Absence"
-            labels.append(f"{reason} - {credit_hours} h")
+    for rule in app.absence_retriever.absences_for_day(target_day):
+        credit_hours = rule.hours if rule.hours is not None else app.config.hours_per_day
+        reason = rule.reason or "Absence"
+        labels.append(f"{reason} - {credit_hours} h")
     return labels
 
 
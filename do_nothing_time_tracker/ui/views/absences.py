@@ -317,6 +317,12 @@ def _ensure_absence_editor(app: TrackerApp) -> ft.AlertDialog:
         dense=True,
         text_align=ft.TextAlign.RIGHT,
     )
+    app.track_text_focus(
+        app._absence_start_field,
+        app._absence_end_field,
+        app._absence_reason_field,
+        app._absence_hours_field,
+    )
     app._absence_editor_title = ft.Text("")
 
     _ensure_start_date_picker(app)
@@ -513,6 +519,7 @@ def _delete_absence(app: TrackerApp, index: int) -> None:
     del app.config.absences[index]
     _persist_absences(app)
     app.refresh_all()
+    app._show_undo_message("Absence deleted.")
 
 
 def _persist_absences(app: TrackerApp) -> None:
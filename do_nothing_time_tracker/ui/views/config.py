@@ -98,6 +98,7 @@ def build(app: TrackerApp) -> ft.Container:
         value=str(app.data_dir),
         width=520,
     )
+    app.track_text_focus(app.config_hours_field, app.config_data_dir_field)
     app.config_status_text = ft.Text("", size=12, color=SECONDARY_GRAY, text_align=ft.TextAlign.CENTER)
     buttons = ft.Row(
         alignment=ft.MainAxisAlignment.CENTER,
@@ -11,6 +11,7 @@ from datetime import datetime
 from datetime import time
 from datetime import timedelta
 from typing import Optional
+from typing import Sequence
 from typing import TYPE_CHECKING
 
 import flet as ft
@@ -38,7 +39,7 @@ def default_entry_bounds(app: TrackerApp, day: date) -> tuple[datetime, datetime
     return start_dt, end_dt
 
 
-def entries_with_draft(app: TrackerApp, day: date, base_entries: list[Entry]) -> list[Entry]:
+def entries_with_draft(app: TrackerApp, day: date, base_entries: Sequence[Entry]) -> list[Entry]:
     entries = list(base_entries)
     if app._draft_entry and app._draft_entry.start.date() == day:
         if all(p.id != app._draft_entry.id for p in entries):
@@ -119,6 +120,7 @@ def editing_entry_control(app: TrackerApp, entry: Entry) -> ft.Control:
     end_hour_field, end_min_field, end_inputs = time_input_controls(
         " ", entry.end.time() if entry.end else None, allow_blank=True
     )
+    app.track_text_focus(start_hour_field, start_min_field, end_hour_field, end_min_field)
 
     def handle_save(_: ft.ControlEvent) -> None:
         try:
@@ -133,7 +135,7 @@ def editing_entry_control(app: TrackerApp, entry: Entry) -> ft.Control:
             open_entry = app.state.open_entry()
             if updated.is_open and open_entry and open_entry.id != updated.id:
                 raise ValueError("Close the running entry before creating another open one.")
-            app.state.save_entry(updated)
+            app.state.save_entry(updated, history=app.history)
             if is_draft_entry(app, entry.id):
                 app._draft_entry = None
             app.editing_entry_id = None
@@ -270,6 +272,7 @@ def build_entry_editor(
     end_hour_field, end_min_field, end_inputs = time_input_controls(
         "End", default_end_time, allow_blank=allow_open_end
     )
+    app.track_text_focus(date_field, start_hour_field, start_min_field, end_hour_field, end_min_field)
 
     def handle_submit(_: ft.ControlEvent) -> None:
         try:
@@ -290,7 +293,7 @@ def build_entry_editor(
             open_entry = app.state.open_entry()
             if updated.is_open and open_entry and open_entry.id != updated.id:
                 raise ValueError("Close the running entry before creating another open one.")
-            app.state.save_entry(updated)
+            app.state.save_entry(updated, history=app.history)
             app.page.dialog.open = False
             app.refresh_all()
         except Exception as exc:  # noqa: BLE001
@@ -329,8 +332,9 @@ def delete_entry(app: TrackerApp, entry: Entry) -> None:
         return
     if app.editing_entry_id == entry.id:
         app.editing_entry_id = None
-    app.state.delete_entry(entry.id)
+    app.state.delete_entry(entry.id, history=app.history)
     app.refresh_all()
+    app._show_undo_message("Entry deleted.")
 
 
 __all__ = [
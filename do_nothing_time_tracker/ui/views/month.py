@@ -61,6 +61,7 @@ def refresh(app: TrackerApp, now: datetime) -> None:
         absence_retriever=app.absence_retriever,
         config=app.config,
         now=now,
+        cache=app.day_cache,
     )
     week_details = month_result.period.weeks
     if not week_details:
@@ -145,6 +145,7 @@ def refresh(app: TrackerApp, now: datetime) -> None:
         absence_retriever=app.absence_retriever,
         config=app.config,
         now=reference_now,
+        cache=app.day_cache,
     )
     day_summary = day_result.period.summary
     worked_hours = day_summary.worked
@@ -199,7 +200,7 @@ def goto_today(app: TrackerApp, _: ft.ControlEvent | None = None) -> None:
 
 def handle_clock_in(app: TrackerApp, _: ft.ControlEvent | None = None) -> None:
     try:
-        app.state.clock_in()
+        app.state.clock_in(history=app.history)
         goto_today(app)
     except ValueError as exc:
         app._show_message(str(exc))
@@ -207,7 +208,7 @@ def handle_clock_in(app: TrackerApp, _: ft.ControlEvent | None = None) -> None:
 
 def handle_clock_out(app: TrackerApp, _: ft.ControlEvent | None = None) -> None:
     try:
-        app.state.clock_out()
+        app.state.clock_out(history=app.history)
         goto_today(app)
     except ValueError as exc:
         app._show_message(str(exc))
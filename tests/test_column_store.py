@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from do_nothing_time_tracker.models import Config
+from do_nothing_time_tracker.models import Entry
+from do_nothing_time_tracker.state import TrackerState
+from do_nothing_time_tracker.storage import EntryStorage
+from do_nothing_time_tracker.summaries import ConfigAbsenceRetriever
+from do_nothing_time_tracker.summaries import get_range_summary
+from do_nothing_time_tracker.summaries import get_year_summary
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from do_nothing_time_tracker.column_store import ColumnEntryRetriever  # noqa: E402
+from do_nothing_time_tracker.column_store import EntryColumnStore  # noqa: E402
+
+
+def _seed(state: TrackerState) -> None:
+    start = datetime(2023, 1, 2, 8, 0)
+    entries = []
+    for idx in range(700):
+        day = start + timedelta(days=idx)
+        entries.append(Entry(id=f"m{idx}", start=day, end=day + timedelta(hours=3, minutes=idx % 60)))
+        if idx % 3 == 0:
+            afternoon = day + timedelta(hours=5)
+            entries.append(Entry(id=f"a{idx}", start=afternoon, end=afternoon + timedelta(hours=2)))
+    state.apply_batch(entries)
+
+
+def test_column_store_matches_entry_summaries(tmp_path: Path) -> None:
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    _seed(state)
+    store = EntryColumnStore(state)
+    retriever = ColumnEntryRetriever(store)
+    config = Config()
+
+    for year in (2023, 2024):
+        start, end = date(year, 1, 1), date(year, 12, 31)
+        expected = get_year_summary(
+            start, end, entry_retriever=state, absence_retriever=ConfigAbsenceRetriever(config), config=config
+        )
+        months = expected.period.months
+        by_day = [day.summary.worked for month in months for week in month.weeks for day in week.days]
+        assert np.allclose(retriever.worked_hours_by_day(start, end), by_day)
+        assert store.worked_hours(start, end) == pytest.approx(expected.summary.total_worked)
+        absences = ConfigAbsenceRetriever(config)
+        summary = get_range_summary(
+            start, end, entry_retriever=retriever, absence_retriever=absences, config=config
+        )
+        assert summary.total_remaining == pytest.approx(expected.summary.total_remaining)
+        assert summary.worked_days == expected.summary.worked_days
+    assert retriever.entries_for_day(date(2023, 1, 2)) == state.entries_for_day(date(2023, 1, 2))
+
+
+def test_column_store_follows_mutations(tmp_path: Path) -> None:
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    _seed(state)
+    store = EntryColumnStore(state)
+    day = date(2023, 1, 2)
+    assert store.worked_hours(day, day) == pytest.approx(5.0)
+
+    state.delete_entry("a0")
+    state.save_entry(Entry(id="m0", start=datetime(2023, 1, 3, 6), end=datetime(2023, 1, 3, 7)))
+    assert store.worked_hours(day, day) == 0.0
+    assert [entry.id for entry in store.entries_for_day(date(2023, 1, 3))] == ["m0", "m1"]
+
+    now = datetime.now().replace(second=0, microsecond=0)
+    today = now.date()
+    started = datetime.combine(today, datetime.min.time())
+    state.clock_in(started)
+    assert store.worked_hours(today, today, now=now) == pytest.approx((now - started) / timedelta(hours=1))
+    assert store.worked_hours(today, today) == 0.0
+    assert len(store) == len(state.all_entries())
+    store.close()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from datetime import datetime
+from do_nothing_time_tracker.models import Entry
+
+import pickle
+
+
+def test_entries_hold_minutes_and_survive_pickling() -> None:
+    entry = Entry(id="a", start=datetime(2025, 1, 6, 9, 15, 42, 5), end=datetime(2025, 1, 6, 12, 0))
+    assert entry.start == datetime(2025, 1, 6, 9, 15)
+    assert (entry.start_minutes, entry.end_minutes) == (28_935_915, 28_936_080)
+    assert entry.duration_hours() == 2.75
+    assert Entry.from_dict(entry.to_dict()) == entry
+    assert pickle.loads(pickle.dumps(entry)) == entry
+    moved = entry.with_updates(start=datetime(1969, 12, 31, 23, 0))
+    assert moved.start_minutes == -60 and moved.end == entry.end
+    assert not hasattr(entry, "__dict__")
+
+
+def test_equal_entries_hash_alike() -> None:
+    entry = Entry(id="a", start=datetime(2025, 1, 6, 9), end=datetime(2025, 1, 6, 12))
+    same = Entry.from_minutes("a", entry.start_minutes, entry.end_minutes)
+    assert entry == same and hash(entry) == hash(same)
+    assert len({entry, same, entry.with_updates(end=datetime(2025, 1, 6, 13))}) == 2
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from do_nothing_time_tracker.events import AbsencesChanged
+from do_nothing_time_tracker.events import EntriesChanged
+from do_nothing_time_tracker.models import AbsenceRule
+from do_nothing_time_tracker.models import Config
+from do_nothing_time_tracker.models import Entry
+from do_nothing_time_tracker.models import StorageOptions
+from do_nothing_time_tracker.registry import StateRegistry
+from do_nothing_time_tracker.storage import EntryStorage
+from pathlib import Path
+from typing import List
+
+import pytest
+import threading
+
+
+def _entry(entry_id: str, day: date, start_hour: int = 9, end_hour: int = 17) -> Entry:
+    start = datetime.combine(day, datetime.min.time())
+    return Entry(id=entry_id, start=start.replace(hour=start_hour), end=start.replace(hour=end_hour))
+
+
+def test_sessions_for_one_data_dir_share_a_single_state(tmp_path: Path) -> None:
+    registry = StateRegistry()
+    config = Config()
+    first = registry.acquire(tmp_path, config)
+    second = registry.acquire(tmp_path / "entries" / "..", config)
+    assert first is second and first.refs == 2
+    assert len(registry) == 1
+
+    seen: List[EntriesChanged] = []
+    second.events.subscribe(seen.append)
+    started = datetime.now().replace(second=0, microsecond=0)
+    entry = first.state.clock_in(started)
+    assert second.state.open_entry() == entry
+    assert [event.entry_ids for event in seen] == [(entry.id,)]
+    assert first.revision == 1
+
+    registry.release(first)
+    assert len(registry) == 1
+    registry.release(second)
+    assert len(registry) == 0
+    assert EntryStorage(base_dir=tmp_path / "entries").read_open_hint() == [started.strftime("%Y-%m")]
+
+    third = registry.acquire(tmp_path, config)
+    assert third is not first and third.state.open_entry() == entry
+    registry.release(third)
+
+
+def test_each_session_undoes_only_its_own_entry_and_absence_edits(tmp_path: Path) -> None:
+    registry = StateRegistry()
+    session = registry.acquire(tmp_path, Config())
+    history, other_history = session.new_history(), session.new_history()
+    seen: List[object] = []
+    session.events.subscribe(seen.append)
+    holiday = AbsenceRule(start=date(2024, 12, 24), end=date(2024, 12, 26), reason="Holiday")
+    session.save_absences([holiday], history=history)
+    entry = session.state.clock_in(datetime.now().replace(second=0, microsecond=0), history=history)
+    manual = session.state.save_entry(_entry("other", date(2024, 12, 2)), history=other_history)
+
+    assert history.undo() is not None
+    assert session.state.open_entry() is None and session.absences == [holiday]
+    assert session.state.find_entry(manual.id) == manual
+    assert history.undo() is not None
+    assert session.absences == []
+    assert isinstance(seen[-1], AbsencesChanged) and seen[-1].first_day == holiday.start
+    assert history.redo() is not None and history.redo() is not None
+    assert session.absences == [holiday] and session.state.open_entry() == entry
+    assert other_history.undo() is not None and session.state.find_entry(manual.id) is None
+
+    session.save_absences([holiday, AbsenceRule(start=date(2025, 1, 2))], history=history)
+    session.absences = [holiday]  # changed behind the history's back
+    with pytest.raises(ValueError, match="changed since"):
+        history.undo()
+    registry.release(session)
+
+
+def test_undo_of_a_specific_edit_refuses_once_it_is_no_longer_the_newest(tmp_path: Path) -> None:
+    registry = StateRegistry()
+    session = registry.acquire(tmp_path, Config())
+    history = session.new_history()
+    day = date(2024, 12, 2)
+    session.state.save_entry(_entry("a", day, 9, 10), history=history)
+    session.state.delete_entry("a", history=history)
+    deletion = history.latest
+    session.state.save_entry(_entry("b", day, 11, 12), history=history)
+
+    with pytest.raises(ValueError, match="newer changes"):
+        history.undo(deletion)
+    assert session.state.find_entry("b") is not None and history.latest is not deletion
+    assert history.undo() is not None
+    assert history.undo(deletion) is deletion
+    assert session.state.find_entry("a") is not None
+    with pytest.raises(ValueError, match="already undone"):
+        history.undo(deletion)
+    registry.release(session)
+
+def test_undo_refuses_to_restore_an_entry_over_a_later_one(tmp_path: Path) -> None:
+    registry = StateRegistry()
+    session = registry.acquire(tmp_path, Config())
+    history = session.new_history()
+    day = date(2024, 12, 2)
+    original = session.state.save_entry(_entry("a", day, 9, 12), history=history)
+    session.state.save_entry(original.with_updates(end=datetime(2024, 12, 2, 10)), history=history)
+    session.state.save_entry(_entry("b", day, 10, 12))
+
+    with pytest.raises(ValueError, match="overlap"):
+        history.undo()
+    assert session.state.find_entry("a").end == datetime(2024, 12, 2, 10)
+    registry.release(session)
+
+
+def test_reconnect_during_release_sees_the_flushed_state(tmp_path: Path) -> None:
+    registry = StateRegistry()
+    config = Config(storage=StorageOptions(flush_delay=60))
+    session = registry.acquire(tmp_path, config)
+    entry = session.state.save_entry(_entry("late", date(2024, 12, 2)))
+    close = session.state.close
+    reconnected: List[object] = []
+
+    def slow_close() -> None:
+        worker.start()
+        worker.join(0.1)  # the reconnect must wait for the flush below
+        close()
+
+    worker = threading.Thread(target=lambda: reconnected.append(registry.acquire(tmp_path, config)))
+    session.state.close = slow_close  # type: ignore[method-assign]
+    registry.release(session)
+    worker.join()
+
+    fresh = reconnected[0]
+    assert fresh is not session and fresh.state.find_entry("late") == entry
+    registry.release(fresh)
+
+
+def test_joining_an_open_session_closes_entries_left_running_overnight(tmp_path: Path) -> None:
+    registry = StateRegistry()
+    session = registry.acquire(tmp_path, Config())
+    yesterday = date.today() - timedelta(days=1)
+    midnight = datetime.combine(yesterday, datetime.min.time())
+    running = session.state.save_entry(Entry(id="night", start=midnight))
+    assert session.state.open_entry() == running
+
+    assert registry.acquire(tmp_path, Config()) is session
+    assert session.state.open_entry() is None
+    assert session.state.find_entry("night").end == midnight.replace(hour=23, minute=59)
+    registry.release(session)
+    registry.release(session)
@@ -0,0 +1,463 @@
+from __future__ import annotations
+
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from do_nothing_time_tracker.events import absence_change
+from do_nothing_time_tracker.events import AbsencesChanged
+from do_nothing_time_tracker.events import EntriesChanged
+from do_nothing_time_tracker.locks import ReadWriteLock
+from do_nothing_time_tracker.models import AbsenceRule
+from do_nothing_time_tracker.models import Entry
+from do_nothing_time_tracker.models import OverlapPolicy
+from do_nothing_time_tracker.state import TrackerState
+from do_nothing_time_tracker.storage import EntryStorage
+from pathlib import Path
+from typing import Callable
+from typing import List
+
+import itertools
+import pytest
+import threading
+import time
+
+
+class CountingStorage(EntryStorage):
+    """EntryStorage that records which months were read."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.loaded_months: List[str] = []
+
+    def load_month(self, key: str) -> List[Entry]:
+        self.loaded_months.append(key)
+        return super().load_month(key)
+
+
+def _closed(entry_id: str, day: date, start_hour: int = 9, end_hour: int = 17) -> Entry:
+    return Entry(
+        id=entry_id,
+        start=datetime.combine(day, datetime.min.time()) + timedelta(hours=start_hour),
+        end=datetime.combine(day, datetime.min.time()) + timedelta(hours=end_hour),
+    )
+
+
+def _seed_history(base_dir: Path) -> None:
+    storage = EntryStorage(base_dir=base_dir)
+    for month in range(1, 13):
+        day = date(2024, month, 3)
+        storage.save_month(storage.month_key_from_date(day), [_closed(f"e{month}", day)])
+
+
+def test_lazy_state_only_loads_touched_months(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    TrackerState(EntryStorage(base_dir=tmp_path))  # writes the open-entry hint
+
+    storage = CountingStorage(base_dir=tmp_path)
+    state = TrackerState(storage, lazy=True)
+    assert storage.loaded_months == []
+    assert state.open_entry() is None
+
+    assert [entry.id for entry in state.entries_for_day(date(2024, 3, 3))] == ["e3"]
+    assert state.entries_for_month(2024, 4)[0].id == "e4"
+    assert storage.loaded_months == ["2024-03", "2024-04"]
+
+    assert state.find_entry("e11") is not None
+    assert set(storage.loaded_months) == {f"2024-{month:02d}" for month in range(1, 13)}
+
+
+def test_lazy_state_saves_without_loading_other_months(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    TrackerState(EntryStorage(base_dir=tmp_path))
+    storage = CountingStorage(base_dir=tmp_path)
+    state = TrackerState(storage, lazy=True)
+
+    state.save_entry(_closed("new", date(2024, 5, 20)))
+    assert storage.loaded_months == ["2024-05"]
+    moved = state.entries_for_month(2024, 5)[0].with_updates(start=datetime(2024, 6, 10, 9))
+    state.save_entry(moved)
+    state.apply_batch([_closed("batch", date(2024, 6, 11))])
+    assert storage.loaded_months == ["2024-05", "2024-06"]
+    assert [entry.id for entry in state.entries_for_month(2024, 6)] == ["e6", "e5", "batch"]
+
+
+def test_lazy_state_tracks_open_entry_through_hint(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    state = TrackerState(EntryStorage(base_dir=tmp_path), lazy=True)
+    today = datetime.combine(date.today(), datetime.min.time())
+    running = state.clock_in(today)
+    assert EntryStorage(base_dir=tmp_path).read_open_hint() == [EntryStorage.month_key_from_date(today)]
+
+    storage = CountingStorage(base_dir=tmp_path)
+    reopened = TrackerState(storage, lazy=True)
+    assert reopened.open_entry() == running
+    assert storage.loaded_months == [EntryStorage.month_key_from_date(today)]
+
+    reopened.clock_out(today + timedelta(minutes=5))
+    assert EntryStorage(base_dir=tmp_path).read_open_hint() == []
+
+
+def test_lazy_state_closes_overnight_entry_without_full_load(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    state.clock_in(datetime(2024, 6, 10, 9, 0))
+
+    storage = CountingStorage(base_dir=tmp_path)
+    reopened = TrackerState(storage, lazy=True)
+    assert storage.loaded_months == ["2024-06"]
+    assert reopened.open_entry() is None
+    closed = reopened.entries_for_day(date(2024, 6, 10))
+    assert closed[0].end == datetime(2024, 6, 10, 23, 59)
+
+
+def test_state_can_leave_overnight_entries_running(tmp_path: Path) -> None:
+    running = TrackerState(EntryStorage(base_dir=tmp_path)).clock_in(datetime(2024, 6, 10, 9, 0))
+
+    storage = RecordingStorage(base_dir=tmp_path)
+    kept = TrackerState(storage, close_overnight=False)
+    assert kept.open_entry() == running
+    assert storage.saved_months == []
+    assert kept.close_overnight_entries()
+    assert kept.find_entry(running.id).end == datetime(2024, 6, 10, 23, 59)
+
+
+class RecordingStorage(EntryStorage):
+    """EntryStorage that records every month write."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.saved_months: List[str] = []
+
+    def save_month(self, key: str, entries: List[Entry]) -> None:
+        self.saved_months.append(key)
+        super().save_month(key, entries)
+
+
+def test_coalesced_state_writes_each_dirty_month_once_on_flush(tmp_path: Path) -> None:
+    storage = RecordingStorage(base_dir=tmp_path)
+    state = TrackerState(storage, flush_delay=60)
+    today = datetime.combine(date.today(), datetime.min.time())
+    state.clock_in(today)
+    state.clock_out(today + timedelta(hours=1))
+    state.save_entry(_closed("jan", date(2024, 1, 3)))
+    state.save_entry(_closed("jan", date(2024, 1, 4)))
+    assert storage.saved_months == []
+    assert state.has_pending_writes
+
+    state.flush()
+    assert sorted(storage.saved_months) == sorted({"2024-01", EntryStorage.month_key_from_date(today)})
+    assert not state.has_pending_writes
+    reloaded = EntryStorage(base_dir=tmp_path).load_all()
+    assert [entry.start.day for entry in reloaded["2024-01"]] == [4]
+    state.close()
+
+
+def test_coalesced_state_flushes_after_quiet_period(tmp_path: Path) -> None:
+    storage = RecordingStorage(base_dir=tmp_path)
+    state = TrackerState(storage, flush_delay=0.01, max_unflushed=0.05)
+    state.save_entry(_closed("a", date(2024, 1, 3)))
+    deadline = time.monotonic() + 2
+    while state.has_pending_writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage.saved_months == ["2024-01"]
+    state.close()
+
+
+def test_open_entry_pointer_follows_mutations(tmp_path: Path) -> None:
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    today = datetime.combine(date.today(), datetime.min.time())
+    running = state.clock_in(today + timedelta(hours=9))
+    assert state.open_entry() is running
+
+    with pytest.raises(ValueError, match="another entry is open"):
+        state.save_entry(Entry.new(start=today + timedelta(hours=13)))
+    moved = running.with_updates(start=today + timedelta(hours=8))
+    state.save_entry(moved)
+    assert state.open_entry() is moved
+
+    state.clock_out(today + timedelta(hours=12))
+    assert state.open_entry() is None
+    reopened = state.clock_in(today + timedelta(hours=13))
+    assert state.delete_entry(reopened.id)
+    assert state.open_entry() is None
+
+
+def test_id_index_stays_consistent_and_deletes_touch_one_month(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    storage = RecordingStorage(base_dir=tmp_path)
+    state = TrackerState(storage)
+    state.save_entry(_closed("early", date(2024, 3, 1)))
+    state.save_entry(_closed("e3", date(2024, 5, 20)))
+    storage.saved_months.clear()
+
+    assert state.delete_entry("early")
+    assert storage.saved_months == ["2024-03"]
+    assert state.find_entry("e3").start.month == 5
+
+    expected = {
+        entry.id: (key, idx)
+        for key, bucket in state.entries_by_month.items()
+        for idx, entry in enumerate(bucket)
+    }
+    assert state._positions == expected
+
+
+def test_day_buckets_match_a_filtered_sort_after_mutations(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    day = date(2024, 3, 3)
+    state.save_entry(_closed("late", day, 18, 19))
+    state.save_entry(_closed("early", day, 6, 7))
+    state.save_entry(_closed("e3", date(2024, 3, 4)))
+    state.delete_entry("late")
+
+    for target in (day, date(2024, 3, 4)):
+        month = state.entries_by_month[EntryStorage.month_key_from_date(target)]
+        expected = sorted((entry for entry in month if entry.start.date() == target), key=lambda e: e.start)
+        assert state.entries_for_day(target) == tuple(expected)
+    assert [entry.id for entry in state.entries_for_day(day)] == ["early"]
+    assert state.entries_for_day(date(2024, 3, 5)) == ()
+
+
+def test_apply_batch_persists_each_touched_month_once(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    storage = RecordingStorage(base_dir=tmp_path)
+    state = TrackerState(storage)
+    storage.saved_months.clear()
+
+    with state.batch() as batch:
+        for day in range(10, 20):
+            batch.save(_closed(f"mar{day}", date(2024, 3, day)))
+        batch.save(_closed("e3", date(2024, 4, 20)))
+        batch.delete("e5")
+    assert sorted(storage.saved_months) == ["2024-03", "2024-04", "2024-05"]
+    assert len(state.entries_for_month(2024, 3)) == 10
+    assert state.find_entry("e3").start.month == 4
+    assert state.find_entry("e5") is None
+
+    today = datetime.combine(date.today(), datetime.min.time())
+    with pytest.raises(ValueError, match="more than one entry open"):
+        state.apply_batch([Entry.new(start=today), Entry.new(start=today + timedelta(hours=1))])
+    with pytest.raises(ValueError, match="ends before it starts"):
+        state.apply_batch([Entry(id="x", start=today, end=today - timedelta(hours=1))])
+    assert state.open_entry() is None
+    assert len(state.entries_for_month(2024, 3)) == 10
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=hour, minutes=minute)
+
+
+def test_overlapping_saves_are_rejected_trimmed_or_merged(tmp_path: Path) -> None:
+    day = date(2024, 3, 4)
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    state.save_entry(_closed("morning", day, 9, 12))
+    with pytest.raises(ValueError, match="overlaps"):
+        state.save_entry(_closed("lunch", day, 11, 13))
+    state.save_entry(_closed("lunch", day, 12, 13))  # touching is fine
+
+    state.overlap_policy = OverlapPolicy.TRIM
+    trimmed = state.save_entry(_closed("afternoon", day, 12, 17))
+    assert (trimmed.start, trimmed.end) == (_at(day, 13), _at(day, 17))
+    with pytest.raises(ValueError, match="fully contains"):
+        state.save_entry(_closed("all-day", day, 8, 18))
+
+    state.overlap_policy = OverlapPolicy.MERGE
+    merged = state.save_entry(_closed("long", day, 11, 14))
+    assert (merged.start, merged.end) == (_at(day, 9), _at(day, 17))
+    assert [entry.id for entry in state.entries_for_day(day)] == ["long"]
+
+
+@pytest.mark.parametrize("policy", [OverlapPolicy.REJECT, OverlapPolicy.TRIM])
+def test_running_entry_ends_where_the_next_entry_starts(tmp_path: Path, policy: OverlapPolicy) -> None:
+    day = date.today()
+    state = TrackerState(EntryStorage(base_dir=tmp_path), overlap_policy=policy)
+    state.save_entry(_closed("later", day, 14, 16))
+    running = state.clock_in(_at(day, 8))
+    assert running.start == _at(day, 8) and running.end is None
+    state.save_entry(_closed("evening", day, 17, 18))
+    assert state.find_overlaps(day, day) == []
+
+    state.clock_out(_at(day, 12))
+    if policy == OverlapPolicy.REJECT:
+        with pytest.raises(ValueError, match="overlaps existing entries"):
+            state.clock_in(_at(day, 15))
+    else:
+        assert state.clock_in(_at(day, 15)).start == _at(day, 16)
+
+
+@pytest.mark.parametrize("policy", list(OverlapPolicy))
+def test_clock_out_stops_at_an_entry_saved_while_running(tmp_path: Path, policy: OverlapPolicy) -> None:
+    day = date.today()
+    state = TrackerState(EntryStorage(base_dir=tmp_path), overlap_policy=policy)
+    state.clock_in(_at(day, 10))
+    state.save_entry(_closed("meeting", day, 14, 15))
+
+    closed = state.clock_out(_at(day, 17))
+    assert (closed.start, closed.end) == (_at(day, 10), _at(day, 14))
+    assert state.open_entry() is None
+    assert [entry.id for entry in state.entries_for_day(day)] == [closed.id, "meeting"]
+
+
+def test_undo_and_redo_reapply_only_the_recorded_delta(tmp_path: Path) -> None:
+    day = date(2024, 3, 4)
+    state = TrackerState(EntryStorage(base_dir=tmp_path), overlap_policy=OverlapPolicy.MERGE)
+    state.apply_batch([_closed("morning", day, 9, 12), _closed("afternoon", day, 13, 17)])
+    state.save_entry(_closed("lunch", day, 11, 14))  # merges both neighbours away
+    state.delete_entry("lunch")
+    storage = RecordingStorage(base_dir=tmp_path)
+    state.storage = storage
+
+    assert state.undo()
+    assert state.find_entry("lunch").end == _at(day, 17)
+    assert state.undo()
+    assert [entry.id for entry in state.entries_for_day(day)] == ["morning", "afternoon"]
+    assert set(storage.saved_months) == {"2024-03"}
+    assert state.redo()
+    assert [entry.id for entry in state.entries_for_day(day)] == ["lunch"]
+    assert [entry.id for entry in EntryStorage(base_dir=tmp_path).load_month("2024-03")] == ["lunch"]
+
+    state.save_entry(_closed("lunch", day, 10, 11))  # new edit drops the redo stack
+    assert not state.redo()
+    state.history.clear()
+    assert not state.undo()
+
+
+def test_undo_refuses_entries_changed_since(tmp_path: Path) -> None:
+    day = date(2024, 3, 4)
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    state.save_entry(_closed("a", day, 9, 12))
+    state.save_entry(_closed("a", day, 8, 12))
+    stale, _ = state.history._undo
+    state.history.clear()
+    state.history.record(stale)  # as if the second save had not been recorded
+
+    with pytest.raises(ValueError, match="changed since"):
+        state.undo()
+    assert not state.history.can_undo
+    assert state.find_entry("a").start == _at(day, 8)
+
+
+def test_find_overlaps_audits_existing_data(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path)
+    storage.save_month(
+        "2024-03",
+        [
+            _closed("a", date(2024, 3, 4), 9, 12),
+            _closed("b", date(2024, 3, 4), 11, 13),
+            _closed("c", date(2024, 3, 4), 13, 14),
+            _closed("d", date(2024, 3, 20), 9, 10),
+        ],
+    )
+    april = date(2024, 4, 1)
+    storage.save_month("2024-04", [_closed("e", april, 9, 10), _closed("f", april, 9, 11)])
+    state = TrackerState(storage)
+    overlaps = state.find_overlaps(date(2024, 1, 1), date(2024, 12, 31))
+    pairs = [(first.id, second.id) for first, second in overlaps]
+    assert pairs == [("a", "b"), ("e", "f")]
+    assert state.find_overlaps(date(2024, 3, 5), date(2024, 3, 31)) == []
+
+
+def test_mutations_publish_affected_ids_and_dates(tmp_path: Path) -> None:
+    _seed_history(tmp_path)
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    events: List[EntriesChanged] = []
+    state.events.subscribe(events.append)
+
+    state.save_entry(_closed("e3", date(2024, 5, 20)))
+    state.delete_entry("e7")
+    with state.batch() as batch:
+        batch.save(_closed("new", date(2024, 8, 1)))
+        batch.delete("e9")
+
+    assert events == [
+        EntriesChanged(entry_ids=("e3",), first_day=date(2024, 3, 3), last_day=date(2024, 5, 20)),
+        EntriesChanged(entry_ids=("e7",), first_day=date(2024, 7, 3), last_day=date(2024, 7, 3)),
+        EntriesChanged(entry_ids=("e9", "new"), first_day=date(2024, 8, 1), last_day=date(2024, 9, 3)),
+    ]
+    assert events[0].touches(date(2024, 4, 1), date(2024, 4, 30))
+    assert not events[1].touches(date(2024, 8, 1), date(2024, 8, 31))
+
+
+def test_absence_change_spans_added_and_removed_rules() -> None:
+    vacation = AbsenceRule(start=date(2024, 8, 5), end=date(2024, 8, 16), reason="Vacation")
+    sick = AbsenceRule(start=date(2024, 2, 1), reason="Sick")
+    assert absence_change([vacation], [vacation]) is None
+    assert absence_change([vacation], [vacation, sick]) == AbsencesChanged(date(2024, 2, 1), date(2024, 2, 1))
+    assert absence_change([vacation, sick], []) == AbsencesChanged(date(2024, 2, 1), date(2024, 8, 16))
+
+
+@pytest.mark.parametrize(("journal", "flush_delay"), [(False, 0.0), (True, 0.005)])
+def test_concurrent_clocking_and_edits_lose_no_writes(
+    tmp_path: Path, journal: bool, flush_delay: float
+) -> None:
+    state = TrackerState(EntryStorage(base_dir=tmp_path, journal=journal), flush_delay=flush_delay)
+    today = datetime.combine(date.today(), datetime.min.time())
+    slots = itertools.count()
+    clocked: List[Entry] = []
+    failures: List[BaseException] = []
+
+    def editor(worker: int) -> None:
+        for idx in range(30):
+            entry = _closed(f"w{worker}-{idx}", date(2023, 1, 1) + timedelta(days=worker * 30 + idx))
+            state.save_entry(entry)
+            state.save_entry(entry.with_updates(end=entry.end + timedelta(minutes=30)))
+            if idx % 5 == 0:
+                state.delete_entry(entry.id)
+
+    def clocker() -> None:
+        for _ in range(30):
+            slot = today + timedelta(minutes=2 * next(slots))
+            try:
+                clocked.append(state.clock_in(slot))
+                state.clock_out(slot + timedelta(minutes=1))
+            except ValueError:
+                pass  # another thread holds the open entry or the slot
+
+    def reader() -> None:
+        for idx in range(200):
+            state.open_entry()
+            state.entries_for_day(date(2023, 1, 1) + timedelta(days=idx))
+            state.find_entry(f"w0-{idx % 30}")
+
+    def run(target: Callable[..., None], *args: int) -> None:
+        try:
+            target(*args)
+        except BaseException as exc:  # noqa: BLE001
+            failures.append(exc)
+
+    threads = [threading.Thread(target=run, args=(editor, worker)) for worker in range(4)]
+    threads += [threading.Thread(target=run, args=(clocker,)) for _ in range(3)]
+    threads += [threading.Thread(target=run, args=(reader,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    state.close()
+
+    assert failures == []
+    reloaded = EntryStorage(base_dir=tmp_path).load_all()
+    stored = {entry.id: entry for entries in reloaded.values() for entry in entries}
+    in_memory = {entry.id: entry for entries in state.entries_by_month.values() for entry in entries}
+    assert stored == in_memory
+    for worker in range(4):
+        for idx in range(30):
+            entry_id = f"w{worker}-{idx}"
+            assert (entry_id in stored) == (idx % 5 != 0)
+            if entry_id in stored:
+                assert stored[entry_id].end.hour == 17 and stored[entry_id].end.minute == 30
+    assert clocked and all(entry.id in stored for entry in clocked)
+
+
+def test_read_write_lock_reentrancy_rules() -> None:
+    lock = ReadWriteLock()
+    with lock.write():
+        with lock.read(), lock.write():
+            pass
+    with lock.read():
+        with lock.read():
+            pass
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+    with lock.write():  # every hold was released
+        pass
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from datetime import date
+from datetime import datetime
+from do_nothing_time_tracker.backends import open_storages
+from do_nothing_time_tracker.columnar import OPEN_END
+from do_nothing_time_tracker.models import AbsenceRule
+from do_nothing_time_tracker.models import Entry
+from do_nothing_time_tracker.models import FsyncPolicy
+from do_nothing_time_tracker.models import StorageBackend
+from do_nothing_time_tracker.models import StorageOptions
+from do_nothing_time_tracker.state import TrackerState
+from do_nothing_time_tracker.storage import AbsenceStorage
+from do_nothing_time_tracker.storage import decode_month
+from do_nothing_time_tracker.storage import encode_month
+from do_nothing_time_tracker.storage import EntryStorage
+from do_nothing_time_tracker.storage import FileSyncer
+from do_nothing_time_tracker.storage import get_codec
+from pathlib import Path
+
+import json
+import pytest
+import time
+
+
+def _entry(entry_id: str, start: datetime, end: datetime | None = None) -> Entry:
+    return Entry(id=entry_id, start=start, end=end)
+
+
+def test_journal_appends_instead_of_rewriting_month(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path, journal=True)
+    state = TrackerState(storage)
+    state.clock_in(datetime(2025, 1, 6, 9, 0))
+    state.clock_out(datetime(2025, 1, 6, 17, 0))
+
+    assert not (tmp_path / "2025-01.json").exists()
+    lines = (tmp_path / "journal" / "2025-01.log").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[-1])["end"] == "2025-01-06T17:00"
+
+    reloaded = EntryStorage(base_dir=tmp_path, journal=True).load_all()
+    assert [entry.end for entry in reloaded["2025-01"]] == [datetime(2025, 1, 6, 17, 0)]
+
+
+def test_journal_replays_deletes_and_moves_between_months(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path)
+    storage.save_month("2025-01", [_entry("a", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12))])
+    state = TrackerState(EntryStorage(base_dir=tmp_path, journal=True))
+    state.save_entry(_entry("a", datetime(2025, 2, 3, 9), datetime(2025, 2, 3, 12)))
+    state.save_entry(_entry("b", datetime(2025, 1, 7, 9), datetime(2025, 1, 7, 10)))
+    state.delete_entry("b")
+
+    reloaded = EntryStorage(base_dir=tmp_path, journal=True).load_all()
+    assert reloaded["2025-01"] == []
+    assert [entry.id for entry in reloaded["2025-02"]] == ["a"]
+
+
+def test_journal_append_after_a_torn_record_keeps_the_new_record(tmp_path: Path) -> None:
+    state = TrackerState(EntryStorage(base_dir=tmp_path, journal=True))
+    state.save_entry(_entry("a", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12)))
+    log = tmp_path / "journal" / "2025-01.log"
+    with log.open("ab") as handle:
+        handle.write(b'{"op":"put","id":"torn","sta')
+
+    state = TrackerState(EntryStorage(base_dir=tmp_path, journal=True))
+    state.save_entry(_entry("b", datetime(2025, 1, 7, 9), datetime(2025, 1, 7, 10)))
+    reloaded = EntryStorage(base_dir=tmp_path, journal=True).load_all()
+    assert [entry.id for entry in reloaded["2025-01"]] == ["a", "b"]
+
+
+def test_journal_compacts_on_threshold_and_close(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path, journal=True, compact_threshold=3)
+    state = TrackerState(storage)
+    for day in (6, 7, 8):
+        state.save_entry(_entry(f"e{day}", datetime(2025, 1, day, 9), datetime(2025, 1, day, 17)))
+    assert not (tmp_path / "journal" / "2025-01.log").exists()
+    assert len(json.loads((tmp_path / "2025-01.json").read_text(encoding="utf-8"))) == 3
+
+    state.delete_entry("e6")
+    assert (tmp_path / "journal" / "2025-01.log").exists()
+    state.close()
+    assert not (tmp_path / "journal" / "2025-01.log").exists()
+    assert [entry.id for entry in EntryStorage(base_dir=tmp_path).load_month("2025-01")] == ["e7", "e8"]
+
+
+def test_journal_ignores_torn_trailing_record(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path, journal=True)
+    entry = _entry("a", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12))
+    storage.save_entry("2025-01", [entry], entry)
+    with (tmp_path / "journal" / "2025-01.log").open("a", encoding="utf-8") as handle:
+        handle.write('{"op":"put","id":"b","sta')
+
+    assert [item.id for item in storage.load_month("2025-01")] == ["a"]
+
+
+def test_sqlite_backend_migrates_json_tree_once(tmp_path: Path) -> None:
+    EntryStorage(base_dir=tmp_path / "entries").save_month(
+        "2025-01", [_entry("a", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12))]
+    )
+    AbsenceStorage(base_dir=tmp_path / "absences").save_rules([AbsenceRule(start=date(2025, 1, 7))])
+    options = StorageOptions(backend=StorageBackend.SQLITE)
+
+    absence_storage, entry_storage = open_storages(tmp_path, options)
+    assert [entry.id for entry in entry_storage.load_month("2025-01")] == ["a"]
+    assert [rule.start for rule in absence_storage.load_all()] == [date(2025, 1, 7)]
+    entry_storage.remove_entry("2025-01", [], "a")
+    entry_storage.close()
+
+    # The database already holds data, so the JSON tree is not imported again.
+    _, entry_storage = open_storages(tmp_path, options)
+    assert entry_storage.load_all() == {}
+    entry_storage.close()
+
+
+def test_sqlite_backend_range_queries_and_state_round_trip(tmp_path: Path) -> None:
+    _, entry_storage = open_storages(tmp_path, StorageOptions(backend=StorageBackend.SQLITE))
+    state = TrackerState(entry_storage)
+    state.save_entry(_entry("jan", datetime(2025, 1, 31, 9), datetime(2025, 1, 31, 17)))
+    state.save_entry(_entry("feb", datetime(2025, 2, 1, 9), datetime(2025, 2, 1, 10)))
+    state.clock_in(datetime.combine(date.today(), datetime.min.time()))
+    state.save_entry(_entry("jan", datetime(2025, 2, 3, 9), datetime(2025, 2, 3, 17)))
+
+    assert entry_storage.entries_for_month(2025, 1) == []
+    assert [entry.id for entry in entry_storage.entries_for_month(2025, 2)] == ["feb", "jan"]
+    assert [entry.id for entry in entry_storage.entries_for_day(date(2025, 2, 3))] == ["jan"]
+    assert len(entry_storage.open_entries()) == 1
+    assert TrackerState(entry_storage).entries_by_month.keys() == state.entries_by_month.keys() - {"2025-01"}
+    state.close()
+
+
+def test_snapshot_cache_only_reparses_modified_months(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path)
+    for month in (1, 2, 3):
+        day = datetime(2025, month, 3, 9)
+        storage.save_month(f"2025-{month:02d}", [_entry(f"e{month}", day, day.replace(hour=17))])
+
+    cold = EntryStorage(base_dir=tmp_path, snapshot_cache=True)
+    first = cold.load_all()
+    assert (cold.cache_stats.hits, cold.cache_stats.misses) == (0, 3)
+
+    EntryStorage(base_dir=tmp_path).save_month(
+        "2025-02", [_entry("changed", datetime(2025, 2, 4, 9), datetime(2025, 2, 4, 10))]
+    )
+    warm = EntryStorage(base_dir=tmp_path, snapshot_cache=True)
+    second = warm.load_all()
+    assert (warm.cache_stats.hits, warm.cache_stats.misses) == (2, 1)
+    assert second["2025-01"] == first["2025-01"]
+    assert [entry.id for entry in second["2025-02"]] == ["changed"]
+
+
+def test_absence_snapshot_cache_round_trip(tmp_path: Path) -> None:
+    rules = [AbsenceRule(start=date(2024, 12, 24)), AbsenceRule(start=date(2025, 1, 6), hours=4)]
+    AbsenceStorage(base_dir=tmp_path, snapshot_cache=True).save_rules(rules)
+
+    storage = AbsenceStorage(base_dir=tmp_path, snapshot_cache=True)
+    assert storage.load_all() == rules
+    assert (storage.cache_stats.hits, storage.cache_stats.misses) == (2, 0)
+
+
+@pytest.mark.parametrize("indent", [True, False])
+def test_encode_month_matches_stdlib_document(indent: bool) -> None:
+    entries = [
+        _entry('quote"id', datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12)),
+        _entry("open", datetime(2025, 1, 7, 9)),
+    ]
+    expected = json.dumps(
+        [entry.to_dict() for entry in entries],
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    )
+    assert encode_month(entries, indent=indent).decode("utf-8") == expected
+    assert decode_month(encode_month(entries, indent=indent), get_codec()) == entries
+
+
+def test_compact_storage_round_trip_with_default_codec(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path, codec=get_codec(), indent=False)
+    entries = [_entry("a", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12))]
+    storage.save_month("2025-01", entries)
+    assert b"\n" not in (tmp_path / "2025-01.json").read_bytes()
+    assert EntryStorage(base_dir=tmp_path).load_month("2025-01") == entries
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_load_all_matches_sequential_order(tmp_path: Path, executor: str) -> None:
+    storage = EntryStorage(base_dir=tmp_path)
+    for month in range(1, 13):
+        day = datetime(2024, month, 5, 9)
+        storage.save_month(f"2024-{month:02d}", [_entry(f"e{month}", day, day.replace(hour=12))])
+
+    sequential = EntryStorage(base_dir=tmp_path).load_all()
+    parallel = EntryStorage(base_dir=tmp_path, load_workers=4, load_executor=executor).load_all()
+    assert list(parallel.items()) == list(sequential.items())
+
+
+def test_parallel_absence_load_all(tmp_path: Path) -> None:
+    rules = [AbsenceRule(start=date(year, 3, 1), reason=str(year)) for year in range(2018, 2026)]
+    AbsenceStorage(base_dir=tmp_path).save_rules(rules)
+    assert AbsenceStorage(base_dir=tmp_path, load_workers=4).load_all() == rules
+
+
+@pytest.mark.parametrize("backend", list(StorageBackend))
+def test_absence_save_years_rewrites_only_those_years(tmp_path: Path, backend: StorageBackend) -> None:
+    absences, _ = open_storages(tmp_path, StorageOptions(backend=backend))
+    rules = [AbsenceRule(start=date(year, 3, 1), reason=str(year)) for year in (2023, 2024, 2025)]
+    absences.save_rules(rules)
+    updated = [rules[0], AbsenceRule(start=date(2024, 5, 1), reason="moved")]
+    absences.save_years(updated + [AbsenceRule(start=date(2023, 9, 1), reason="ignored")], [2024, 2025])
+    assert absences.load_all() == [rules[0], updated[1]]
+    if backend == StorageBackend.JSON:
+        year_files = sorted(path.name for path in (tmp_path / "absences").glob("*.json"))
+        assert year_files == ["2023.json", "2024.json"]
+
+
+@pytest.mark.parametrize("policy", list(FsyncPolicy))
+def test_month_writes_are_atomic_under_every_fsync_policy(tmp_path: Path, policy: FsyncPolicy) -> None:
+    storage = EntryStorage(base_dir=tmp_path, fsync_policy=policy, fsync_interval=3600)
+    entries = [_entry("a", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12))]
+    storage.save_month("2025-01", entries)
+    storage.save_month("2025-01", entries + [_entry("b", datetime(2025, 1, 7, 9))])
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["2025-01.json"]
+    assert [entry.id for entry in storage.load_month("2025-01")] == ["a", "b"]
+    storage.sync()
+
+
+def test_batch_syncer_flushes_the_last_write_of_a_burst(tmp_path: Path) -> None:
+    syncer = FileSyncer(FsyncPolicy.BATCH, interval=0.05)
+    syncer.write(tmp_path / "2025-01.json", b"[]")
+    assert syncer._pending
+    deadline = time.monotonic() + 5
+    while syncer._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not syncer._pending
+
+
+def test_failed_write_leaves_previous_month_intact(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    storage = EntryStorage(base_dir=tmp_path)
+    entries = [_entry("a", datetime(2025, 1, 6, 9), datetime(2025, 1, 6, 12))]
+    storage.save_month("2025-01", entries)
+
+    def crash(*_args: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr("do_nothing_time_tracker.storage.os.replace", crash)
+    with pytest.raises(OSError, match="disk full"):
+        storage.save_month("2025-01", [])
+    assert EntryStorage(base_dir=tmp_path).load_month("2025-01") == entries
+
+
+@pytest.mark.parametrize("compression", ["gzip", "lzma"])
+def test_closed_years_are_archived_and_loaded_on_demand(tmp_path: Path, compression: str) -> None:
+    storage = EntryStorage(base_dir=tmp_path, archive=True, archive_compression=compression)
+    storage.save_month("2023-03", [_entry("a", datetime(2023, 3, 1, 9, 0), datetime(2023, 3, 1, 17, 0))])
+    storage.save_month("2023-11", [_entry("b", datetime(2023, 11, 2, 9, 0), datetime(2023, 11, 2, 12, 0))])
+    storage.save_month("2025-01", [_entry("c", datetime(2025, 1, 6, 9, 0))])
+
+    assert storage.archive_closed_years(current_year=2025) == [2023]
+    assert sorted(path.name for path in tmp_path.glob("*.json")) == ["2025-01.json"]
+
+    reopened = EntryStorage(base_dir=tmp_path)
+    assert reopened.month_keys() == ["2023-03", "2023-11", "2025-01"]
+    assert reopened.load_month("2025-01")[0].id == "c"
+    assert reopened._archived_years == {}
+    assert [entry.id for entry in reopened.load_month("2023-11")] == ["b"]
+    assert set(reopened._archived_years) == {"2023"}
+
+
+def test_edits_to_archived_months_supersede_and_fold_back(tmp_path: Path) -> None:
+    storage = EntryStorage(base_dir=tmp_path)
+    storage.save_month("2023-03", [_entry("a", datetime(2023, 3, 1, 9, 0), datetime(2023, 3, 1, 17, 0))])
+    storage.archive_year(2023)
+
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    state.save_entry(_entry("a", datetime(2023, 3, 1, 8, 0), datetime(2023, 3, 1, 17, 0)))
+    assert EntryStorage(base_dir=tmp_path).load_month("2023-03")[0].start.hour == 8
+
+    storage = EntryStorage(base_dir=tmp_path)
+    storage.archive_year(2023)
+    assert not (tmp_path / "2023-03.json").exists()
+    assert EntryStorage(base_dir=tmp_path).load_all()["2023-03"][0].start.hour == 8
+
+
+def test_columnar_months_round_trip_and_scan_without_entries(tmp_path: Path) -> None:
+    entries = [
+        _entry("a", datetime(2025, 1, 6, 9, 0), datetime(2025, 1, 6, 12, 30)),
+        _entry("b", datetime(2025, 1, 7, 9, 0)),
+    ]
+    legacy = EntryStorage(base_dir=tmp_path)
+    legacy.save_month("2025-01", entries)
+    storage = EntryStorage(base_dir=tmp_path, month_format="columnar")
+    assert storage.month_columns("2025-01") is None
+    assert storage.load_month("2025-01") == entries
+
+    storage.save_month("2025-01", entries)
+    assert storage.month_keys() == ["2025-01"]
+    assert not (tmp_path / "2025-01.json").exists()
+    assert EntryStorage(base_dir=tmp_path).load_month("2025-01") == entries
+    with storage.month_columns("2025-01") as columns:
+        assert list(columns.ends)[0] - list(columns.starts)[0] == 210
+        assert columns.ends[1] == OPEN_END
+
+    assert storage.export_json(tmp_path / "export") == 1
+    exported = json.loads((tmp_path / "export" / "2025-01.json").read_text(encoding="utf-8"))
+    assert exported == [entry.to_dict() for entry in entries]
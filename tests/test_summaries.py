@@ -6,17 +6,26 @@ from datetime import date
 from datetime import datetime
 from datetime import time
 from datetime import timedelta
+from do_nothing_time_tracker import summaries
 from do_nothing_time_tracker.models import AbsenceRule
 from do_nothing_time_tracker.models import Config
 from do_nothing_time_tracker.models import Entry
+from do_nothing_time_tracker.state import TrackerState
+from do_nothing_time_tracker.storage import EntryStorage
+from do_nothing_time_tracker.summaries import AbsenceIndex
+from do_nothing_time_tracker.summaries import ConfigAbsenceRetriever
+from do_nothing_time_tracker.summaries import DailyLedger
+from do_nothing_time_tracker.summaries import DayDetailsCache
 from do_nothing_time_tracker.summaries import DayWorkSummary
 from do_nothing_time_tracker.summaries import get_month_summary
+from do_nothing_time_tracker.summaries import get_range_summary
 from do_nothing_time_tracker.summaries import get_week_summary
 from do_nothing_time_tracker.summaries import get_year_summary
 from do_nothing_time_tracker.summaries import RangeSummary
 from do_nothing_time_tracker.summaries import summarize_day
 from do_nothing_time_tracker.summaries import summarize_range
 from itertools import count
+from pathlib import Path
 from typing import Callable
 from typing import Dict
 from typing import List
@@ -792,3 +801,170 @@ def test_get_year_summary_balanced_under_and_over() -> None:
         worked_days=len(per_day_hours),
     )
     assert result.period.months
+
+
+def _assert_same_summary(actual: RangeSummary, expected: RangeSummary) -> None:
+    _assert_range_summary(
+        actual,
+        expected=expected.total_expected,
+        worked=expected.total_worked,
+        remaining=expected.total_remaining,
+        overworked=expected.total_overworked,
+        workdays=expected.workdays,
+        worked_days=expected.worked_days,
+    )
+
+
+def test_daily_ledger_matches_recomputed_ranges() -> None:
+    entries: Dict[date, List[Entry]] = {}
+    current = date(2024, 11, 1)
+    for index in range(120):
+        entries[current] = closed_entries(4 + index % 7, day=current)
+        current += timedelta(days=1)
+    absences = {WORKDAY: _absence_rules_for_day(WORKDAY, 4)}
+    entry_retriever = FakeEntryRetriever(entries)
+    absence_retriever = FakeAbsenceRetriever(absences)
+    config = Config(hours_per_day=8, workdays=[0, 1, 2, 3, 4])
+    ledger = DailyLedger(entry_retriever=entry_retriever, absence_retriever=absence_retriever, config=config)
+
+    def check(start: date, end: date) -> None:
+        expected = get_week_summary(
+            start, end, entry_retriever=entry_retriever, absence_retriever=absence_retriever, config=config
+        )
+        _assert_same_summary(ledger.summary(start, end), expected.summary)
+
+    for start, end in [
+        (date(2025, 1, 6), date(2025, 1, 12)),
+        (date(2024, 12, 30), date(2025, 1, 3)),
+        (date(2024, 11, 15), date(2025, 2, 10)),
+        (date(2025, 1, 1), date(2025, 1, 1)),
+    ]:
+        check(start, end)
+
+    entries[WORKDAY] = closed_entries(11, day=WORKDAY)
+    ledger.invalidate(WORKDAY, WORKDAY)
+    config.hours_per_day = 7
+    check(date(2025, 1, 6), date(2025, 1, 12))
+
+
+@pytest.mark.parametrize("vectorized", [True, False], ids=["numpy", "fallback"])
+def test_range_summary_matches_year_summary(vectorized: bool, monkeypatch: pytest.MonkeyPatch) -> None:
+    if vectorized:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(summaries, "np", None)
+    today = date.today()
+    start = today - timedelta(days=400)
+    entries: Dict[date, List[Entry]] = {}
+    absences: Dict[date, List[AbsenceRule]] = {}
+    current = start
+    for index in range(401):
+        if index % 9:
+            entries[current] = closed_entries(index % 11, 1.5, day=current)
+        if index % 13 == 0:
+            absences[current] = _absence_rules_for_day(current, 4 + index % 6)
+        current += timedelta(days=1)
+    now = datetime.combine(today, time(0, 0)) + timedelta(minutes=45)
+    entries[today] = [Entry(id=_next_id("open"), start=datetime.combine(today, time(0, 0)), end=None)]
+    full_day = start + timedelta(days=2)
+    absences.setdefault(full_day, []).append(AbsenceRule(start=full_day, end=full_day, reason="Full day"))
+    retrievers = dict(
+        entry_retriever=FakeEntryRetriever(entries),
+        absence_retriever=FakeAbsenceRetriever(absences),
+    )
+
+    for config in (TEST_CONFIG, Config(hours_per_day=6, workdays=[])):
+        expected = get_year_summary(start, today, config=config, now=now, **retrievers)
+        actual = get_range_summary(start, today, config=config, now=now, **retrievers)
+        _assert_same_summary(actual, expected.summary)
+    assert get_range_summary(today, start, config=TEST_CONFIG, **retrievers) == summarize_range([])
+
+
+def test_absence_index_matches_linear_scan() -> None:
+    base = date(2024, 1, 1)
+    rules = [AbsenceRule(start=base + timedelta(days=day), reason=f"Day {day}") for day in range(0, 700, 3)]
+    rules += [
+        AbsenceRule(start=date(2024, 7, 29), end=date(2024, 8, 16), reason="Summer", hours=8),
+        AbsenceRule(start=date(2024, 3, 1), end=date(2025, 6, 30), reason="Part time", hours=2),
+        AbsenceRule(start=date(2024, 5, 10), end=date(2024, 5, 1), reason="Inverted"),
+    ]
+    config = Config(absences=rules)
+    index = AbsenceIndex(rules, max_span_days=60)
+    linear = ConfigAbsenceRetriever(config)
+    for offset in range(760):
+        target = base + timedelta(days=offset)
+        assert index.absences_for_day(target) == linear.absences_for_day(target)
+
+    config.absences = rules[:1]
+    index.rebuild(config.absences)
+    assert index.absences_for_day(base) == rules[:1]
+    assert index.absences_for_day(date(2024, 8, 1)) == []
+
+
+def test_daily_ledger_follows_state_events_and_adds_live_time(tmp_path: Path) -> None:
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    config = Config(hours_per_day=8, workdays=[0, 1, 2, 3, 4, 5, 6])
+    absence_retriever = FakeAbsenceRetriever()
+    ledger = DailyLedger(
+        entry_retriever=state, absence_retriever=absence_retriever, config=config, events=state.events
+    )
+    today = date.today()
+    start = today - timedelta(days=10)
+    assert ledger.summary(start, today).total_worked == 0.0
+
+    state.save_entry(closed_entries(3, day=start)[0])
+    opened = datetime.combine(today, time(0, 0))
+    state.clock_in(opened)
+    now = opened + timedelta(minutes=30)
+    summary = ledger.summary(start, today, now=now)
+    expected = get_month_summary(
+        start, today, entry_retriever=state, absence_retriever=absence_retriever, config=config, now=now
+    )
+    _assert_same_summary(summary, expected.summary)
+    assert summary.total_worked == pytest.approx(3.5)
+    assert ledger.summary(start, today).total_worked == pytest.approx(3.0)
+    ledger.close()
+
+
+def test_day_details_cache_reuses_unchanged_days(tmp_path: Path) -> None:
+    state = TrackerState(EntryStorage(base_dir=tmp_path))
+    config = Config(hours_per_day=8, workdays=[0, 1, 2, 3, 4])
+    cache = DayDetailsCache(events=state.events)
+    calls: List[date] = []
+
+    class CountingRetriever:
+        def entries_for_day(self, target: date) -> Sequence[Entry]:
+            calls.append(target)
+            return state.entries_for_day(target)
+
+    def month() -> RangeSummary:
+        return get_month_summary(
+            date(2025, 1, 1),
+            date(2025, 1, 31),
+            entry_retriever=CountingRetriever(),
+            absence_retriever=FakeAbsenceRetriever(),
+            config=config,
+            cache=cache,
+        ).summary
+
+    state.save_entry(closed_entries(6, day=WORKDAY)[0])
+    first = month()
+    assert len(calls) == 31 and len(cache) == 31
+    calls.clear()
+    assert month() == first and calls == []
+
+    state.save_entry(closed_entries(2, day=WORKDAY + timedelta(days=1))[0])
+    assert month().total_worked == pytest.approx(8)
+    assert calls == [WORKDAY + timedelta(days=1)]
+
+    calls.clear()
+    config.hours_per_day = 7
+    assert month().total_expected == pytest.approx(23 * 7)
+    assert len(calls) == 31
+
+    calls.clear()
+    state.clock_in(datetime.combine(WORKDAY + timedelta(days=2), time(9, 0)))
+    month()
+    month()
+    assert calls.count(WORKDAY + timedelta(days=2)) == 2
+    cache.close()